@@ -0,0 +1,124 @@
+import os, sys, json, time, argparse, platform, threading, statistics
+from http.client import HTTPConnection
+from urllib.parse import urlencode
+from datetime import datetime, timezone
+
+REPO_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, REPO_PATH)
+
+from src.api.server import serve, _cached_render
+from src.utils.data_index import list_years, list_careers
+
+
+def request_paths(careers):
+    # Every endpoint for a few careers of the last edition
+    year = list_years()[-1]
+    paths = ["/api/years", f"/api/careers?{urlencode({'year': year})}"]
+    for career in list_careers(year)[:careers]:
+        query = urlencode({"year": year, "career": career})
+        paths += [
+            f"/api/kpis?{query}",
+            f"/api/distribution?{query}",
+            f"/api/histogram?{query}&view=all",
+            f"/api/histogram?{query}&view=approved",
+            f"/api/top?{query}",
+            f"/api/trend?{urlencode({'career': career})}",
+        ]
+
+    return paths
+
+
+def load(port, paths, clients, requests, revalidate):
+    # Every client keeps one connection open and cycles through the paths
+    latencies = [ [] for _ in range(clients) ]
+    statuses = {}
+    lock = threading.Lock()
+
+    def client(i):
+        connection = HTTPConnection("127.0.0.1", port)
+        etags = {}
+        for n in range(requests):
+            path = paths[(i + n) % len(paths)]
+            headers = {"If-None-Match": etags[path]} if revalidate and path in etags else {}
+            start = time.perf_counter()
+            connection.request("GET", path, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            latencies[i].append(time.perf_counter() - start)
+            etags[path] = response.getheader("ETag")
+            with lock:
+                statuses[response.status] = statuses.get(response.status, 0) + 1
+        connection.close()
+
+    threads = [ threading.Thread(target=client, args=(i,)) for i in range(clients) ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    times = sorted(latency for client_latencies in latencies for latency in client_latencies)
+
+    return {
+        "requests": len(times),
+        "seconds": elapsed,
+        "requests_per_second": len(times) / elapsed,
+        "p50_seconds": statistics.median(times),
+        "p99_seconds": times[int(len(times) * 0.99) - 1],
+        "statuses": {str(status): n for status, n in sorted(statuses.items())},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the request rate of the local JSON API on the repository data.")
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent keep-alive connections")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per client and scenario")
+    parser.add_argument("--careers", type=int, default=10, help="Careers whose endpoints are requested")
+    parser.add_argument("--output", help="Write the JSON results to this file instead of stdout")
+    args = parser.parse_args()
+
+    server = serve(port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+
+    paths = request_paths(args.careers)
+    results = {}
+    try:
+        # Cold: the response cache is empty, every path is rendered once
+        _cached_render.cache_clear()
+        results["cold"] = load(port, paths, 1, len(paths), revalidate=False)
+        results["cached"] = load(port, paths, args.clients, args.requests, revalidate=False)
+        results["revalidated"] = load(port, paths, args.clients, args.requests, revalidate=True)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    for scenario, result in results.items():
+        print(
+            f"{scenario:<12} {result['requests_per_second']:>10.0f} req/s"
+            f" p50 {result['p50_seconds'] * 1000:>7.2f} ms p99 {result['p99_seconds'] * 1000:>7.2f} ms {result['statuses']}",
+            file=sys.stderr
+        )
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "parameters": {key: value for key, value in vars(args).items() if key != "output"},
+            "paths": len(paths),
+        },
+        "results": results,
+    }
+
+    output = json.dumps(report, indent=1)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
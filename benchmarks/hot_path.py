@@ -0,0 +1,215 @@
+import os, sys, json, time, argparse, tempfile, shutil, subprocess, platform, statistics, tracemalloc
+from contextlib import contextmanager, redirect_stdout
+from datetime import datetime, timezone
+
+REPO_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, REPO_PATH)
+
+from benchmarks.synthetic import generate_dataset
+from src.utils.data_store import build_store, read_processed_year, STORE_PATH
+from src.utils.data_index import build_index, INDEX_PATH
+from src.utils.stats_cube import build_cube, CUBE_PATH
+from src.utils.career_stats import compute_career_stats
+from src.utils.handle_data import generate_analysis
+from src.utils.data_loading import load_dataframe, load_year, career_exists_for_year, load_trend, _load_year, _load_year_aggregates
+from src.utils.cutoff_simulation import build_admission_pool, simulate_cutoffs, vacancy_sweep, bootstrap_cutoffs
+from src.webscraping.pipeline import ingest, anonymize, validate, publish, run_pipeline
+from src.webscraping.processing_data import redistribute_second_options
+
+ANALYSIS_TYPES = ["kpis", "general", "score_range", "top_10_scores", "trend_over_years"]
+
+
+def measure(stage, func, repeat=1, memory=True):
+    # Wall time without tracing, then one traced run for the peak of Python/NumPy allocations
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    peak = None
+    if memory:
+        tracemalloc.start()
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    result = {
+        "stage": stage,
+        "seconds": statistics.median(times),
+        "min_seconds": min(times),
+        "repeat": repeat,
+        "peak_bytes": peak,
+    }
+    print(f"{stage:<40} {result['seconds'] * 1000:>10.2f} ms" + (f" {peak / 2**20:>9.1f} MiB" if peak is not None else ""), file=sys.stderr)
+
+    return result
+
+
+@contextmanager
+def hidden(path):
+    # Temporarily remove a built artifact to time the fallback path
+    moved = f"{path}.hidden"
+    os.rename(path, moved)
+    try:
+        yield
+    finally:
+        os.rename(moved, path)
+
+
+def _render(result):
+    charts = result if isinstance(result, tuple) else (result,)
+    for chart in charts:
+        if hasattr(chart, "to_dict"):
+            chart.to_dict()
+
+
+def run(applicants, careers, years, sample, repeat, memory):
+    results = []
+
+    def bench(stage, func, times=repeat):
+        results.append(measure(stage, func, times, memory))
+
+    editions = []
+    results.append(measure("generate", lambda: editions.extend(generate_dataset(applicants, careers, years)), 1, memory=False))
+
+    # Processing pipeline, stage by stage over every year
+    frames = {}
+    bench("pipeline.ingest", lambda: frames.update({ year: ingest(year) for year in editions }), 1)
+    bench("pipeline.anonymize", lambda: frames.update({ year: anonymize(df) for year, df in frames.items() }), 1)
+    bench("pipeline.validate", lambda: frames.update({ year: validate(df, year)[0] for year, df in frames.items() }), 1)
+    published = {}
+    bench("pipeline.redistribute", lambda: published.update({ year: redistribute_second_options(df) for year, df in frames.items() }), 1)
+    bench("pipeline.publish", lambda: [ publish(df, year) for year, df in published.items() ], 1)
+    bench("build_store", build_store, 1)
+    bench("build_index", build_index, 1)
+    bench("build_cube", build_cube, 1)
+    # Every stage end to end, years in parallel processes (its progress lines go to stderr)
+    with redirect_stdout(sys.stderr):
+        bench("run_pipeline", lambda: run_pipeline(force=True), 1)
+    frames.clear()
+    published.clear()
+
+    # Hot path for the largest careers of the last edition
+    year = editions[-1]
+    sizes = read_processed_year(year).groupby("career").size().sort_values(ascending=False)
+    sample_careers = list(sizes.index[:sample])
+
+    # Years are cached for the life of the process, every timed run starts without them
+    # so the stages below measure actual reads
+    def cold(func):
+        def run():
+            _load_year.cache_clear()
+            return func()
+
+        return run
+
+    with hidden(STORE_PATH):
+        bench("load_dataframe[csv]", cold(lambda: [ load_dataframe(year, career) for career in sample_careers ]))
+    bench("load_dataframe[store]", cold(lambda: [ load_dataframe(year, career) for career in sample_careers ]))
+
+    with hidden(INDEX_PATH):
+        bench("career_exists_for_year[scan]", cold(lambda: [ career_exists_for_year(y, career) for y in editions for career in sample_careers ]))
+    bench("career_exists_for_year[index]", lambda: [ career_exists_for_year(y, career) for y in editions for career in sample_careers ])
+
+    dataframes = { career: load_dataframe(year, career) for career in sample_careers }
+    bench("compute_career_stats", lambda: [ compute_career_stats(df, career) for career, df in dataframes.items() ])
+
+    stats = { career: compute_career_stats(df, career) for career, df in dataframes.items() }
+    trend = {
+        career: { y: load_dataframe(y, career) for y in editions if career_exists_for_year(y, career) }
+        for career in sample_careers
+    }
+
+    # Trend provider, cold (every year built, from the cube or from the year frames read
+    # again) and cached
+    @cold
+    def cold_trend():
+        _load_year_aggregates.cache_clear()
+        return [ load_trend(career) for career in sample_careers ]
+
+    with hidden(CUBE_PATH):
+        bench("load_trend[frames]", cold_trend)
+    bench("load_trend[cube]", cold_trend)
+    bench("load_trend[cached]", lambda: [ load_trend(career) for career in sample_careers ])
+
+    # Cutoff simulation over the whole year, one scenario, a sweep of one career and 1,000 bootstrap draws
+    year_df = load_year(year)
+    pool = build_admission_pool(year_df)
+    bench("build_admission_pool", lambda: build_admission_pool(year_df))
+    bench("simulate_cutoffs", lambda: simulate_cutoffs(pool, 1))
+    bench("vacancy_sweep", lambda: [ vacancy_sweep(pool, career, range(-20, 21)) for career in sample_careers ])
+    bench("bootstrap_cutoffs", lambda: bootstrap_cutoffs(pool, seed=0), 1)
+
+    for analysis_type in ANALYSIS_TYPES:
+        kwargs = lambda career: {"career": career, "dataframes": trend[career]} if analysis_type == "trend_over_years" else {"career": career}
+        bench(f"generate_analysis[{analysis_type}]", lambda: [ _render(generate_analysis(df, analysis_type, **kwargs(career))) for career, df in dataframes.items() ])
+        bench(f"generate_analysis[{analysis_type}][stats]", lambda: [ _render(generate_analysis(stats[career], analysis_type, **kwargs(career))) for career in sample_careers ])
+
+    sizes_on_disk = {
+        "raw_bytes": _directory_size("data/raw"),
+        "processed_bytes": _directory_size("data/processed"),
+        "store_bytes": _directory_size(STORE_PATH),
+        "cube_bytes": os.path.getsize(CUBE_PATH),
+    }
+
+    return results, sizes_on_disk
+
+
+def _directory_size(path):
+    return sum(
+        os.path.getsize(os.path.join(root, file))
+        for root, _, files in os.walk(path) for file in files
+    )
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_PATH, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the load/analyze/render hot path on synthetic editions.")
+    parser.add_argument("--applicants", type=int, default=30000, help="Applicants per edition")
+    parser.add_argument("--careers", type=int, default=90, help="Careers per edition")
+    parser.add_argument("--years", type=int, default=3, help="Number of editions")
+    parser.add_argument("--sample", type=int, default=10, help="Largest careers timed on the hot path")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per hot path stage (the median is reported)")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the traced run that measures peak memory")
+    parser.add_argument("--output", help="Write the JSON results to this file instead of stdout")
+    parser.add_argument("--keep", action="store_true", help="Keep the generated working directory")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="unmsm-bench-")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        results, sizes_on_disk = run(args.applicants, args.careers, args.years, args.sample, args.repeat, not args.no_memory)
+    finally:
+        os.chdir(cwd)
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "parameters": {key: value for key, value in vars(args).items() if key not in ["output", "keep"]},
+            **sizes_on_disk,
+        },
+        "results": results,
+    }
+
+    output = json.dumps(report, indent=1)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import os, sys, csv, json, time, argparse, tempfile, platform, statistics, tracemalloc
+from datetime import datetime, timezone
+
+REPO_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, REPO_PATH)
+
+import numpy as np
+
+from src.webscraping.scraping_data import HEADERS, parse_career_table, stream_career_table, STREAM_CHUNK_SIZE
+
+
+def generate_page(rows, seed=0):
+    # A result page shaped like the university's: one table, a header row, one row per applicant
+    rng = np.random.default_rng(seed)
+    scores = np.round(rng.normal(800, 180, rows), 3)
+    observaciones = ["ALCANZO VACANTE", "", "", "", "", "", "AUSENTE", "ALCANZO VACANTE SEGUNDA OPCI&Oacute;N"]
+
+    lines = [
+        "<!DOCTYPE html>\n<html>\n<head><meta charset=\"utf-8\"><title>Resultados</title></head>\n<body>",
+        "<table class=\"table\">\n  <tr><th>C&oacute;digo</th><th>Apellidos y Nombres</th><th>Escuela</th><th>Puntaje</th><th>M&eacute;rito</th><th>Observaci&oacute;n</th><th>Segunda opci&oacute;n</th></tr>",
+    ]
+    for i in range(rows):
+        observacion = observaciones[i % len(observaciones)]
+        lines.append(
+            f"  <tr>\n    <td>{100000 + i}</td>\n    <td>APELLIDO&nbsp;APELLIDO, NOMBRE {i}</td>\n"
+            f"    <td>INGENIER&Iacute;A DE SISTEMAS</td>\n    <td>{scores[i]:.3f}</td>\n"
+            f"    <td>{i + 1 if observacion == 'ALCANZO VACANTE' else ''}</td>\n    <td>{observacion}</td>\n"
+            f"    <td>{'CIENCIAS DE LA COMPUTACI&Oacute;N' if 'SEGUNDA' in observacion else ''}</td>\n  </tr>"
+        )
+    lines.append("</table>\n</body>\n</html>\n")
+
+    return "\n".join(lines).encode("utf-8")
+
+
+def beautifulsoup_path(page, path):
+    # What scrape_career does without streaming: decode the whole body, build the tree, write
+    rows = parse_career_table(page.decode("utf-8", errors="replace")) or []
+    with open(path, mode="w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(HEADERS)
+        writer.writerows(rows)
+
+def streaming_path(page, path):
+    chunks = ( page[i:i + STREAM_CHUNK_SIZE] for i in range(0, len(page), STREAM_CHUNK_SIZE) )
+    with open(path, mode="w", newline="", encoding="utf-8") as file:
+        stream_career_table(chunks, file)
+
+
+def measure(stage, func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    print(f"{stage:<30} {statistics.median(times) * 1000:>10.2f} ms {peak / 2**20:>9.2f} MiB", file=sys.stderr)
+
+    return {"stage": stage, "seconds": statistics.median(times), "min_seconds": min(times), "repeat": repeat, "peak_bytes": peak}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the BeautifulSoup and streaming extraction of a career result page.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000], help="Applicant rows per generated page")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per parser (the median is reported)")
+    parser.add_argument("--output", help="Write the JSON results to this file instead of stdout")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="unmsm-html-") as workdir:
+        soup_csv = os.path.join(workdir, "beautifulsoup.csv")
+        stream_csv = os.path.join(workdir, "streaming.csv")
+
+        for rows in args.rows:
+            page = generate_page(rows)
+            for stage, func, path in [("beautifulsoup", beautifulsoup_path, soup_csv), ("streaming", streaming_path, stream_csv)]:
+                result = measure(f"{stage}[{rows}]", lambda: func(page, path), args.repeat)
+                results.append({**result, "rows": rows, "page_bytes": len(page)})
+
+            # Both must write exactly the same file
+            with open(soup_csv, "rb") as soup_file, open(stream_csv, "rb") as stream_file:
+                if soup_file.read() != stream_file.read():
+                    raise AssertionError(f"Streaming output differs from BeautifulSoup's for {rows} rows")
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "parameters": {key: value for key, value in vars(args).items() if key != "output"},
+        },
+        "results": results,
+    }
+
+    output = json.dumps(report, indent=1)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+import os, sys, json, shutil, argparse, tempfile, subprocess, platform
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+
+REPO_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, REPO_PATH)
+
+# Each scenario runs in a fresh process and keeps everything it loaded alive, the way a
+# long-running dashboard process keeps its caches. "import" is the baseline for the others
+SCENARIO_SCRIPT = """
+import os, sys, json, gc, tracemalloc
+sys.path.insert(0, sys.argv[2])
+import pandas as pd
+from src.utils.data_index import list_years, list_careers
+from src.utils.data_loading import load_year, load_dataframe
+
+def rss():
+    # Resident memory now, from /proc on Linux (where the replicas run), None elsewhere
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def frame_bytes(frames):
+    # Like memory_usage(deep=True), but categories shared by several frames are counted once
+    total, seen = 0, set()
+    for frame in frames:
+        total += int(frame.index.memory_usage(deep=True))
+        for column in frame.columns:
+            series = frame[column]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                total += series.cat.codes.nbytes
+                categories = series.cat.categories
+                if id(categories) not in seen:
+                    seen.add(id(categories))
+                    total += int(categories.memory_usage(deep=True))
+            else:
+                total += int(series.memory_usage(index=False, deep=True))
+    return total
+
+scenario = sys.argv[1]
+frames = []
+
+# Tracing adds its own memory, so RSS and traced bytes are measured in separate runs
+traced = sys.argv[3] == "traced"
+if traced:
+    tracemalloc.start()
+
+if scenario == "object_frames":
+    # What load_dataframe used to return: one pd.read_csv frame per career, object columns
+    for year in list_years():
+        for career in list_careers(year):
+            frames.append(pd.read_csv(f"data/processed/{year}/{year}-{career}.csv"))
+elif scenario == "compact_years":
+    frames = [ load_year(year) for year in list_years() ]
+elif scenario == "compact_careers":
+    frames = [ load_dataframe(year, career) for year in list_years() for career in list_careers(year) ]
+
+gc.collect()
+print(json.dumps({
+    "frames": len(frames),
+    "frame_bytes": frame_bytes(frames),
+    **({"traced_bytes": tracemalloc.get_traced_memory()[0]} if traced else {"rss_bytes": rss()}),
+}))
+"""
+
+SCENARIOS = ["import", "object_frames", "compact_years", "compact_careers"]
+
+
+def run_scenario(scenario):
+    def run(mode):
+        completed = subprocess.run(
+            [sys.executable, "-c", SCENARIO_SCRIPT, scenario, REPO_PATH, mode],
+            cwd=os.getcwd(), capture_output=True, text=True, check=True,
+        )
+
+        return json.loads(completed.stdout.strip().splitlines()[-1])
+
+    return {**run("rss"), **run("traced")}
+
+
+def generate_data(applicants, careers, years, store):
+    # Synthetic editions processed like the real ones, to see how memory grows with the data
+    from benchmarks.synthetic import generate_dataset
+    from src.utils.data_store import STORE_PATH
+    from src.webscraping.pipeline import run_pipeline
+
+    generate_dataset(applicants, careers, years)
+    with redirect_stdout(sys.stderr):
+        run_pipeline()
+    if not store:
+        shutil.rmtree(STORE_PATH)
+
+
+def dtypes_report():
+    from src.utils.data_index import list_years
+    from src.utils.data_loading import load_year
+
+    year = list_years()[-1]
+
+    return { column: str(dtype).split("(")[0] for column, dtype in load_year(year).dtypes.items() }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report the memory a process holds for the loaded editions, before and after the compact schema.")
+    parser.add_argument("--applicants", type=int, help="Measure synthetic editions with this many applicants each instead of the repository data")
+    parser.add_argument("--careers", type=int, default=90, help="Careers per synthetic edition")
+    parser.add_argument("--years", type=int, default=3, help="Number of synthetic editions")
+    parser.add_argument("--no-store", action="store_true", help="Load the synthetic editions from the processed CSVs instead of a columnar store")
+    parser.add_argument("--output", help="Write the JSON results to this file instead of stdout")
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    workdir = None
+    if args.applicants:
+        workdir = tempfile.mkdtemp(prefix="unmsm-memory-")
+        os.chdir(workdir)
+        generate_data(args.applicants, args.careers, args.years, not args.no_store)
+
+    try:
+        results = { scenario: run_scenario(scenario) for scenario in SCENARIOS }
+        dtypes = dtypes_report()
+        data_path = os.path.abspath("data")
+    finally:
+        os.chdir(cwd)
+        if workdir is not None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    baseline = results["import"]["rss_bytes"]
+    for scenario in SCENARIOS:
+        result = results[scenario]
+        if baseline is not None and result["rss_bytes"] is not None:
+            result["rss_over_import_bytes"] = result["rss_bytes"] - baseline
+
+        print(
+            f"{scenario:<20} {result['frames']:>5} frames {result['frame_bytes'] / 2**20:>9.2f} MiB in frames"
+            f" {result['traced_bytes'] / 2**20:>9.2f} MiB traced"
+            + (f" {result['rss_over_import_bytes'] / 2**20:>9.1f} MiB RSS over import" if "rss_over_import_bytes" in result else ""),
+            file=sys.stderr
+        )
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "parameters": {key: value for key, value in vars(args).items() if key != "output"},
+            "data": data_path,
+            "dtypes": dtypes,
+        },
+        "results": results,
+    }
+
+    output = json.dumps(report, indent=1)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
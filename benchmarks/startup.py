@@ -0,0 +1,129 @@
+import os, sys, json, argparse, subprocess, platform, statistics
+from datetime import datetime, timezone
+
+REPO_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Modules main.py imports, in the order it imports them
+APP_IMPORTS = [
+    "streamlit",
+    "src.utils.handle_data",
+    "src.utils.data_loading",
+    "src.utils.data_index",
+    "src.utils.instrumentation",
+]
+
+# Runs the dashboard once in a fresh process, then reruns it in the same process
+APP_SCRIPT = """
+import sys, json, time, warnings
+warnings.filterwarnings("ignore")
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+imported = time.perf_counter()
+at = AppTest.from_file("main.py", default_timeout=120).run()
+first = time.perf_counter()
+reruns = []
+for _ in range(int(sys.argv[1])):
+    rerun_start = time.perf_counter()
+    at.run()
+    reruns.append(time.perf_counter() - rerun_start)
+interactions = []
+for career in at.selectbox[1].options[:int(sys.argv[1])]:
+    interaction_start = time.perf_counter()
+    at.selectbox[1].select(career).run()
+    interactions.append(time.perf_counter() - interaction_start)
+print(json.dumps({
+    "import_apptest": imported - start,
+    "first_run": first - imported,
+    "reruns": reruns,
+    "interactions": interactions,
+    "exceptions": [ str(e.value) for e in at.exception ],
+}))
+"""
+
+
+def _python(code, *args, flags=()):
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code, *args],
+        cwd=REPO_PATH, capture_output=True, text=True, check=True,
+        env={**os.environ, "PYTHONPATH": REPO_PATH},
+    )
+
+
+def cold_import(repeat):
+    # Fresh interpreter each time, so nothing is in sys.modules yet
+    code = f"import time; start = time.perf_counter(); import {', '.join(APP_IMPORTS)}; print(time.perf_counter() - start)"
+    times = [ float(_python(code).stdout) for _ in range(repeat) ]
+
+    return {"seconds": statistics.median(times), "min_seconds": min(times), "repeat": repeat}
+
+
+def slowest_imports(top):
+    # Cumulative import time of every top-level package from python -X importtime, a
+    # package's cost is that of its most expensive module (usually the package itself)
+    stderr = _python(f"import {', '.join(APP_IMPORTS)}", flags=("-X", "importtime")).stderr
+    packages = {}
+    for line in stderr.splitlines()[1:]:
+        _, cumulative, name = line.split("|")
+        package = name.strip().split(".")[0]
+        packages[package] = max(packages.get(package, 0), int(cumulative) / 1e6)
+
+    return dict(sorted(packages.items(), key=lambda item: -item[1])[:top])
+
+
+def app_runs(reruns):
+    result = json.loads(_python(APP_SCRIPT, str(reruns)).stdout.strip().splitlines()[-1])
+
+    return {
+        "import_apptest_seconds": result["import_apptest"],
+        "first_run_seconds": result["first_run"],
+        "rerun_seconds": statistics.median(result["reruns"]),
+        "interaction_seconds": statistics.median(result["interactions"]),
+        "exceptions": result["exceptions"],
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_PATH, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard's cold start and rerun latency on the repository data.")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters timed for the cold import (the median is reported)")
+    parser.add_argument("--reruns", type=int, default=10, help="Reruns and career changes timed after the first run")
+    parser.add_argument("--top", type=int, default=10, help="Slowest top-level imports listed")
+    parser.add_argument("--output", help="Write the JSON results to this file instead of stdout")
+    args = parser.parse_args()
+
+    results = {
+        "cold_import": cold_import(args.repeat),
+        "slowest_imports_seconds": slowest_imports(args.top),
+        "app": app_runs(args.reruns),
+    }
+    print(f"{'cold import':<20} {results['cold_import']['seconds'] * 1000:>10.2f} ms", file=sys.stderr)
+    for stage in ["first_run_seconds", "rerun_seconds", "interaction_seconds"]:
+        print(f"{stage.replace('_seconds', '').replace('_', ' '):<20} {results['app'][stage] * 1000:>10.2f} ms", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "parameters": {key: value for key, value in vars(args).items() if key != "output"},
+        },
+        "results": results,
+    }
+
+    output = json.dumps(report, indent=1)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import os
+import numpy as np
+import pandas as pd
+
+RAW_HEADERS = ["id", "nombre_completo", "carrera", "puntaje", "vacante", "observacion", "segunda_opcion"]
+
+
+def generate_edition(year, applicants, careers, base_path="data/raw", seed=0, admission_rate=0.1, absent_rate=0.01, second_option_rate=0.02):
+    # Writes one raw CSV per career with the same schema the scraper produces
+    rng = np.random.default_rng(seed)
+    career_names = np.array([ f"CARRERA {i:03d}" for i in range(careers) ])
+
+    # Popular careers get many more applicants than the rest, as in the real data
+    weights = rng.pareto(1.5, careers) + 1
+    career_idx = rng.choice(careers, size=applicants, p=weights / weights.sum())
+
+    scores = np.round(np.clip(rng.normal(800, 180, applicants), 200, 1800), 3)
+    observacion = np.full(applicants, None, dtype=object)
+    vacante = np.full(applicants, np.nan)
+    segunda_opcion = np.full(applicants, None, dtype=object)
+
+    absent = rng.random(applicants) < absent_rate
+    scores[absent] = np.nan
+    observacion[absent] = "AUSENTE"
+
+    # The best scores of every career take its vacancies
+    order = np.lexsort((-np.nan_to_num(scores, nan=-1), career_idx))
+    rank = np.empty(applicants, dtype=int)
+    starts = np.searchsorted(career_idx[order], np.arange(careers))
+    rank[order] = np.arange(applicants) - starts[career_idx[order]]
+    vacancies = np.maximum(1, (np.bincount(career_idx, minlength=careers) * admission_rate).astype(int))
+
+    admitted = ~absent & (rank < vacancies[career_idx])
+    observacion[admitted] = "ALCANZO VACANTE"
+    vacante[admitted] = rank[admitted] + 1
+
+    # Some of the rest enter another career as their second option
+    second = ~absent & ~admitted & (rng.random(applicants) < second_option_rate)
+    targets = (career_idx[second] + rng.integers(1, max(careers, 2), second.sum())) % careers
+    observacion[second] = "ALCANZO VACANTE SEGUNDA OPCIÓN"
+    segunda_opcion[second] = career_names[targets]
+
+    df = pd.DataFrame({
+        "id": rng.permutation(np.arange(100000, 100000 + applicants)),
+        "nombre_completo": "APELLIDO APELLIDO, NOMBRE",
+        "carrera": career_names[career_idx],
+        "puntaje": scores,
+        "vacante": vacante,
+        "observacion": observacion,
+        "segunda_opcion": segunda_opcion,
+    })
+
+    year_path = os.path.join(base_path, year)
+    os.makedirs(year_path, exist_ok=True)
+
+    for career, career_df in df.groupby("carrera", sort=False):
+        career_df.to_csv(os.path.join(year_path, f"{year}-{career}.csv"), index=False, columns=RAW_HEADERS)
+
+    return df
+
+
+def generate_dataset(applicants, careers, years, base_path="data/raw", seed=0):
+    # Editions are named like the real ones: 2000-1, 2000-2, 2001-1, ...
+    editions = [ f"{2000 + i // 2}-{i % 2 + 1}" for i in range(years) ]
+    for i, year in enumerate(editions):
+        generate_edition(year, applicants, careers, base_path, seed + i)
+
+    return editions
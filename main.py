@@ -1,10 +1,11 @@
 import streamlit as st
 import pandas as pd
-import os
-import altair as alt
 import pathlib
 
-from src.utils.handle_data import load_dataframe, career_exists_for_year, generate_analysis
+from src.utils.handle_data import generate_analysis_for, generate_comparison, generate_vacancy_simulation, RANKING_COLUMNS
+from src.utils.data_loading import career_exists_for_year, compare_careers_for, lookup_score_for, bootstrap_cutoffs_for, vacancy_sweep_for, passing_score_for
+from src.utils.data_index import list_years, list_careers, data_version
+from src.utils.instrumentation import start_trace, end_trace, timer, count
 
 # Set page config
 st.set_page_config(
@@ -13,38 +14,147 @@ st.set_page_config(
     layout="wide",
     initial_sidebar_state="collapsed")
 
+# Per-rerun timings, only collected when UNMSM_TRACE is set
+start_trace()
+
 # Apply CSS
-def load_css(file_path):
+@st.cache_resource(show_spinner=False)
+def read_css(file_path):
+    # Read once per process instead of on every rerun
     with open(file_path) as f:
-        st.html(f"<style>{f.read()}</style>")
+        return f"<style>{f.read()}</style>"
+
+def load_css(file_path):
+    st.html(read_css(file_path))
 
 css_path = pathlib.Path("styles.css")
 load_css(css_path)
 
 
 # Methods
-@st.cache_data
-def load_dataframe_cached(year, career):
-    return load_dataframe(year, career)
+CACHE_MAX_ENTRIES = 1000    # Analyses kept per process, least recently used go first
+CACHE_TTL = 24 * 60 * 60    # Seconds
+
+# Cached on (year, career, analysis type, data version) only, so Streamlit hashes a few
+# strings instead of DataFrames. A rebuilt dataset gets a new version and new entries
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+def genereate_analysis_cached(year, career, analysis_type, version):
+    # Only runs on a cache miss
+    count("cache.analysis.miss")
+    return generate_analysis_for(year, career, analysis_type)
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+def compare_careers_cached(year, version):
+    # One aggregate row per career, sorting and filtering reuse it without reading the year again
+    count("cache.comparison.miss")
+    return compare_careers_for(year)
+
+SWEEP_RANGE = 20           # Vacancy changes shown around the published vacancies
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+def simulate_vacancies_cached(year, career, change, version):
+    # The whole year is simulated (second options link careers), only the career is kept.
+    # Fixed seed, so the same inputs always show the same interval
+    count("cache.simulation.miss")
+    simulation = bootstrap_cutoffs_for(year, {career: change}, seed=0).loc[career]
+    sweep = vacancy_sweep_for(year, career, range(-SWEEP_RANGE, SWEEP_RANGE + 1))
+
+    return simulation, passing_score_for(year), generate_vacancy_simulation(sweep, change)
+
+def get_analysis(year, career, analysis_type, version):
+    # Time spent here minus the analysis itself is Streamlit's cache lookup
+    count("cache.analysis.calls")
+    with timer("cache.analysis"):
+        return genereate_analysis_cached(year, career, analysis_type, version)
+
+def render_chart(chart):
+    # Includes serializing the Vega-Lite spec
+    with timer("render.altair"):
+        st.altair_chart(chart, theme="streamlit", use_container_width=True)
 
-@st.cache_data
-def genereate_analysis_cached(df, analysis_type, **kwargs):
-    return generate_analysis(df, analysis_type, **kwargs)
+@st.cache_resource
+def cached_data_version():
+    return {"version": None}
+
+def invalidate_stale_cache(version):
+    # Drop every entry computed for a previous version of the processed dataset
+    current = cached_data_version()
+    if current["version"] != version:
+        genereate_analysis_cached.clear()
+        compare_careers_cached.clear()
+        simulate_vacancies_cached.clear()
+        current["version"] = version
+
+def show_debug_panel():
+    summary = end_trace()
+    if summary is None:
+        return
+
+    with st.expander(f"Depuración: {summary['total_ms']:.0f} ms en esta ejecución"):
+        st.dataframe(
+            [{"Etapa": stage, "Llamadas": data["calls"], "ms": data["ms"]} for stage, data in summary["stages"].items()],
+            use_container_width=True
+        )
+        st.json(summary["counters"])
 
 
 # Dashboard Layout
 st.header("Exámenes de Admisión UNMSM - Dashboard :bar_chart:")
 
+view_option = st.radio('Vista:', ["Por carrera", "Comparar carreras"], horizontal=True)
+
 # Filters
-years_list = os.listdir('data/processed')
+years_list = list_years()
 
 filter_col1, filter_col2 = st.columns(2)
 
 with filter_col1:
     year_option = st.selectbox('Año del examen:', years_list, placeholder='Seleccione el año')
 
-filepath = os.listdir(f'data/processed/{year_option}')
-careers_list = [file.split(".csv")[0].split(f"{year_option}-")[1] for file in filepath]
+# Load data
+version = data_version()
+invalidate_stale_cache(version)
+
+if view_option == "Comparar carreras":
+    comparison_df = compare_careers_cached(year_option, version)
+
+    with filter_col2:
+        compared_careers = st.multiselect(
+            'Carreras a comparar:',
+            comparison_df.index,
+            placeholder='Todas las carreras'
+        )
+
+    sort_option = st.selectbox(
+        'Ordenar por:',
+        ["cutoff_score", "admission_rate", "median", "total_applicants"],
+        format_func=RANKING_COLUMNS.get
+    )
+
+    ranking_df, comparison_boxplot = generate_comparison(comparison_df, compared_careers, sort_option)
+
+    with st.container(border=True):
+        st.write("##### Ranking de carreras")
+        st.dataframe(
+            ranking_df,
+            use_container_width=True,
+            column_config={
+                "Tasa de admisión": st.column_config.ProgressColumn(
+                    "Tasa de admisión",
+                    format="%.2f",
+                    min_value=0,
+                    max_value=1
+                )
+            }
+        )
+
+    with st.container(border=True):
+        render_chart(comparison_boxplot)
+
+    show_debug_panel()
+    st.stop()
+
+careers_list = list_careers(year_option)
 
 with filter_col2:
     career_option = st.selectbox(
@@ -53,31 +163,16 @@ with filter_col2:
         placeholder='Seleccione la carrera'
     )
 
-# Load data
-try:
-    # Load the dataframe for the selected year
-    if career_exists_for_year(year_option, career_option):
-        df = load_dataframe_cached(year_option, career_option)
-    else:
-        st.info(f"No se encontró información para la carrera {career_option} en el año {year_option}.")
-        df = None
-
-    # Load dataframes for the rest of the years
-    valid_years = [year for year in years_list if career_exists_for_year(year, career_option)]
-    if valid_years:
-        dataframes = {year: load_dataframe_cached(year, career_option) for year in valid_years}
-    else:
-        st.info(f"No se encontraron datos para la carrera {career_option} en ningún año seleccionado.")
-        dataframes = {}
-
-except FileNotFoundError:
-    st.info("No se encontró algún archivo.")
+if not career_exists_for_year(year_option, career_option):
+    st.info(f"No se encontró información para la carrera {career_option} en el año {year_option}.")
+    show_debug_panel()
+    st.stop()
 
 
 # Plots
 cols = st.columns(4)
 
-metrics = genereate_analysis_cached(df, analysis_type="kpis", career=career_option)
+metrics = get_analysis(year_option, career_option, "kpis", version)
 
 for i, key, value in zip(range(4), metrics.keys(), metrics.values()):
     with cols[i]:
@@ -88,31 +183,115 @@ cols = st.columns([3, 1])
 
 with cols[0]:
     with st.container(border=True):
-        general_analysis_chart = genereate_analysis_cached(df, analysis_type="general", career=career_option)
-        st.altair_chart(general_analysis_chart, theme="streamlit", use_container_width=True)
+        general_analysis_chart = get_analysis(year_option, career_option, "general", version)
+        render_chart(general_analysis_chart)
 
     with st.container(border=True):
-        trend_chart = genereate_analysis_cached(df, analysis_type="trend_over_years", career=career_option, dataframes=dataframes)
-        st.altair_chart(trend_chart, theme="streamlit", use_container_width=True)
+        trend_chart = get_analysis(None, career_option, "trend_over_years", version)
+        render_chart(trend_chart)
     
 with cols[1]:
     with st.container(border=True):
         st.write("##### Top 10 puntajes")
-        genereate_analysis_cached(df, analysis_type="top_10_scores", career=career_option)
+        top_10_scores = get_analysis(year_option, career_option, "top_10_scores", version)
+        st.dataframe(
+            top_10_scores,
+            width=500,
+            column_config={
+                "Posición": st.column_config.TextColumn(
+                        "#",
+                ),
+                "Puntaje": st.column_config.ProgressColumn(
+                    "Puntaje",
+                    format="%f",
+                    min_value=600,
+                    max_value=max(top_10_scores, default=600)
+                )
+            }
+        )
 
 cols = st.columns(2)
 
-hist1, hist2, bp1, bp2 = genereate_analysis_cached(df, analysis_type="score_range", career=career_option)
+hist1, hist2, bp1, bp2 = get_analysis(year_option, career_option, "score_range", version)
 
 with cols[0]:
     with st.container(border=True):
-        st.altair_chart(bp1, theme="streamlit", use_container_width=True)
-        st.altair_chart(hist1, theme="streamlit", use_container_width=True)
+        render_chart(bp1)
+        render_chart(hist1)
 
 with cols[1]:
     with st.container(border=True):
-        st.altair_chart(bp2, theme="streamlit", use_container_width=True)
-        st.altair_chart(hist2, theme="streamlit", use_container_width=True)
+        render_chart(bp2)
+        render_chart(hist2)
+
+# Rank lookup
+with st.container(border=True):
+    st.write("##### ¿Dónde habrías quedado?")
+
+    score_option = st.number_input('Puntaje:', min_value=0.0, max_value=2000.0, value=None, step=0.125, format="%.3f", placeholder='Ingrese un puntaje')
+
+    if score_option is not None:
+        with timer("lookup.score"):
+            lookup = lookup_score_for(year_option, career_option, score_option)
+
+        # A career file holding only second option rows has no applicants to rank the score against
+        has_applicants = lookup["applicants"] > 0
+
+        cols = st.columns(3)
+        with cols[0]:
+            st.metric(label="Puesto", value=f"{lookup['rank']} de {lookup['applicants']}" if has_applicants else "—")
+        with cols[1]:
+            st.metric(label="Percentil", value=f"{lookup['percentile']:.1f}" if has_applicants else "—")
+        with cols[2]:
+            st.metric(label="Resultado", value=("ALCANZÓ VACANTE" if lookup["admitted"] else "NO ALCANZÓ VACANTE") if has_applicants else "—")
+
+        if not has_applicants:
+            st.caption(f"La carrera {career_option} no tuvo postulantes propios en el año {year_option}, no hay puntajes con los cuales comparar.")
+
+# Vacancy simulation
+with st.container(border=True):
+    st.write("##### ¿Y si cambiaran las vacantes?")
+
+    change_option = st.number_input('Cambio en vacantes:', min_value=-SWEEP_RANGE, max_value=SWEEP_RANGE, value=0, step=1)
+
+    with timer("simulation"):
+        simulation, passing_score, simulation_chart = simulate_vacancies_cached(year_option, career_option, change_option, version)
+
+    def format_score(score):
+        return "—" if pd.isna(score) else f"{score:.3f}"
+
+    cols = st.columns(3)
+    with cols[0]:
+        # Seats left empty when there are not enough applicants at or above the passing score
+        filled = int(simulation["admitted"] + simulation["admitted_second_option"])
+        st.metric(
+            label="Vacantes cubiertas",
+            value=f"{filled} de {int(simulation['vacancies'])}",
+            delta=change_option or None,
+            help="Ingresantes simulados, por primera y segunda opción, de las vacantes ofrecidas"
+        )
+    with cols[1]:
+        cutoff_change = simulation["cutoff_score"] - simulation["observed_cutoff_score"]
+        st.metric(
+            label="Puntaje mínimo simulado",
+            value=format_score(simulation["cutoff_score"]),
+            delta=None if pd.isna(cutoff_change) or cutoff_change == 0 else f"{cutoff_change:+.3f}"
+        )
+    with cols[2]:
+        st.metric(
+            label="Intervalo de confianza 95%",
+            value=f"{format_score(simulation['cutoff_score_low'])} – {format_score(simulation['cutoff_score_high'])}"
+        )
+
+    render_chart(simulation_chart)
+    st.caption(
+        "Simulación sobre las vacantes cubiertas en el examen. Solo se publican las segundas opciones "
+        "de quienes ingresaron por ellas, los demás postulantes no pueden cambiar de carrera en la simulación. "
+        f"Nadie con menos de {passing_score:.3f} puntos, el menor puntaje que ingresó en {year_option}, "
+        "ingresa en la simulación, aunque queden vacantes."
+    )
+
+show_debug_panel()
 
 # Footer
 st.markdown(
@@ -0,0 +1,296 @@
+import json
+import math
+import hashlib
+import logging
+import argparse
+from functools import lru_cache
+from http import HTTPStatus
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+import numpy as np
+import pandas as pd
+
+from src.utils.analysis_data import kpis, status_counts, histogram_frame, summary_frame, top_scores, VIEWS
+from src.utils.career_stats import TOP_K
+from src.utils.data_index import list_years, list_careers, data_version
+from src.utils.data_loading import load_career_stats, load_trend, career_exists_for_year
+from src.utils.instrumentation import start_trace, end_trace, timer, count
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8502
+
+# Rendered responses kept per data version, a rebuilt dataset gets new entries
+RESPONSE_CACHE_SIZE = 4096
+
+logger = logging.getLogger("unmsm.api")
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _param(params, name, default=None):
+    value = params.get(name, default)
+    if value is None:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"Missing parameter: {name}")
+
+    return value
+
+def _year(params):
+    year = _param(params, "year")
+    if year not in list_years():
+        raise ApiError(HTTPStatus.NOT_FOUND, f"No data for year {year}")
+
+    return year
+
+def _career(params):
+    year, career = _year(params), _param(params, "career")
+    if not career_exists_for_year(year, career):
+        raise ApiError(HTTPStatus.NOT_FOUND, f"No data for career {career} in year {year}")
+
+    return year, career
+
+def _stats(params):
+    return load_career_stats(*_career(params))
+
+def _trend_career(params):
+    career = _param(params, "career")
+    if not any( career_exists_for_year(year, career) for year in list_years() ):
+        raise ApiError(HTTPStatus.NOT_FOUND, f"No data for career {career} in any year")
+
+    return career
+
+def _view(params):
+    view = params.get("view", "all")
+    if view not in VIEWS:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"Invalid view: {view} (expected one of {', '.join(VIEWS)})")
+
+    return view
+
+def _k(params):
+    try:
+        k = int(params.get("k", TOP_K))
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "k must be an integer")
+
+    if not 1 <= k <= TOP_K:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"k must be between 1 and {TOP_K}")
+
+    return k
+
+
+def years(params):
+    return {"years": list_years()}
+
+def careers(params):
+    return {"year": _year(params), "careers": list_careers(params["year"])}
+
+def kpis_endpoint(params):
+    return kpis(_stats(params))
+
+def distribution(params):
+    return {"statuses": status_counts(_stats(params))}
+
+def histogram(params):
+    view = _view(params)
+    stats = _stats(params)
+
+    return {"view": view, "bins": histogram_frame(stats, view), "summary": summary_frame(stats, view)}
+
+def top(params):
+    k = _k(params)
+
+    return {"scores": top_scores(_stats(params), k).tolist()}
+
+def trend(params):
+    career = _trend_career(params)
+
+    return {"career": career, "years": load_trend(career).reset_index()}
+
+
+# Every endpoint takes the query parameters and returns plain data
+ENDPOINTS = {
+    "/api/years": years,
+    "/api/careers": careers,
+    "/api/kpis": kpis_endpoint,
+    "/api/distribution": distribution,
+    "/api/histogram": histogram,
+    "/api/top": top,
+    "/api/trend": trend,
+}
+
+# The checks of every endpoint's parameters, in the order the endpoint applies them. They
+# only look at the index, nothing is computed
+ENDPOINT_CHECKS = {
+    "/api/years": [],
+    "/api/careers": [_year],
+    "/api/kpis": [_career],
+    "/api/distribution": [_career],
+    "/api/histogram": [_view, _career],
+    "/api/top": [_k, _career],
+    "/api/trend": [_trend_career],
+}
+
+
+def _jsonable(value):
+    # Frames become lists of records, NaN becomes null (JSON has no NaN)
+    if isinstance(value, pd.DataFrame):
+        return [ _jsonable(record) for record in value.to_dict(orient="records") ]
+    if isinstance(value, dict):
+        return { str(key): _jsonable(item) for key, item in value.items() }
+    if isinstance(value, (list, tuple)):
+        return [ _jsonable(item) for item in value ]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+
+    return value
+
+
+def _endpoint(path):
+    endpoint = ENDPOINTS.get(path)
+    if endpoint is None:
+        raise ApiError(HTTPStatus.NOT_FOUND, f"Unknown endpoint: {path}")
+
+    return endpoint
+
+def check(path, params):
+    # Raises the ApiError the request would get, before anything is rendered
+    _endpoint(path)
+    for check_param in ENDPOINT_CHECKS[path]:
+        check_param(params)
+
+
+def render(path, params):
+    endpoint = _endpoint(path)
+
+    with timer(f"api.{path.rsplit('/', 1)[-1]}"):
+        data = endpoint(params)
+
+    return json.dumps(_jsonable(data), ensure_ascii=False, separators=(",", ":"), allow_nan=False).encode("utf-8")
+
+
+def _etag(version, path, params):
+    # Known before rendering, so a client with a fresh copy is answered without any work
+    key = json.dumps([version, path, sorted(params.items())], ensure_ascii=False)
+
+    return f'"{hashlib.sha1(key.encode("utf-8")).hexdigest()}"'
+
+@lru_cache(maxsize=RESPONSE_CACHE_SIZE)
+def _cached_render(path, params, version):
+    count("cache.api.miss")
+    return render(path, dict(params))
+
+
+def respond(path, params, if_none_match=None):
+    # (status, body, etag) for a GET. Without an index there is no data version to key
+    # on, responses are rendered every time and tagged with a hash of their body
+    version = data_version()
+
+    if version is not None:
+        # Only a resource that exists can be unchanged
+        check(path, params)
+        etag = _etag(version, path, params)
+        if if_none_match is not None and _matches(if_none_match, etag):
+            return HTTPStatus.NOT_MODIFIED, b"", etag
+
+        return HTTPStatus.OK, _cached_render(path, tuple(sorted(params.items())), version), etag
+
+    body = render(path, params)
+    etag = f'"{hashlib.sha1(body).hexdigest()}"'
+    if if_none_match is not None and _matches(if_none_match, etag):
+        return HTTPStatus.NOT_MODIFIED, b"", etag
+
+    return HTTPStatus.OK, body, etag
+
+def _matches(if_none_match, etag):
+    tags = [ tag.strip().removeprefix("W/") for tag in if_none_match.split(",") ]
+
+    return "*" in tags or etag in tags
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so a client reuses its connection across requests
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes, Nagle's algorithm would hold the body back
+    # until the client's delayed ACK (about 40 ms per request)
+    disable_nagle_algorithm = True
+    server_version = "unmsm-api"
+
+    def do_GET(self):
+        self._handle(send_body=True)
+
+    def do_HEAD(self):
+        self._handle(send_body=False)
+
+    def _handle(self, send_body):
+        start_trace("api")
+        try:
+            self._respond(send_body)
+        finally:
+            end_trace()
+
+    def _respond(self, send_body):
+        url = urlsplit(self.path)
+        # A repeated parameter keeps its last value
+        params = { name: values[-1] for name, values in parse_qs(url.query).items() }
+
+        try:
+            status, body, etag = respond(url.path.rstrip("/"), params, self.headers.get("If-None-Match"))
+        except ApiError as error:
+            status, body, etag = error.status, json.dumps({"error": error.message}, ensure_ascii=False).encode("utf-8"), None
+        except Exception:
+            logger.exception("Failed to serve %s", self.path)
+            status, body, etag = HTTPStatus.INTERNAL_SERVER_ERROR, b'{"error":"Internal error"}', None
+
+        self.send_response(status)
+        if etag is not None:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        if status != HTTPStatus.NOT_MODIFIED:
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+
+        if send_body and status != HTTPStatus.NOT_MODIFIED:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # One line per request is too much at a high request rate
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+class ApiServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT):
+    return ApiServer((host, port), ApiHandler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the dashboard's analyses as a local read-only JSON API.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"Address to listen on (default: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port to listen on (default: {DEFAULT_PORT})")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    server = serve(args.host, args.port)
+    logger.info(f"Serving on http://{args.host}:{server.server_address[1]}/api/years")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+from src.utils.career_stats import CareerStats, compute_career_stats, TOP_K
+from src.utils.score_trend import TREND_COLUMNS
+
+# The data behind every analysis of the dashboard, without Streamlit or Altair, so the
+# same results can be served elsewhere (see src/api/server.py)
+
+STATUS_LABELS = ["ALCANZÓ VACANTE", "NO ALCANZÓ VACANTE", "AUSENTE"]
+VIEWS = ["all", "approved"]
+
+
+def as_stats(data, career):
+    # Analyses accept a loaded DataFrame or precomputed CareerStats
+    return data if isinstance(data, CareerStats) else compute_career_stats(data, career)
+
+
+def kpis(stats):
+    return {
+        "total_applicants": stats.total_applicants,
+        "top_score": stats.top_score,
+        "mean_approved_score": float(np.round(stats.mean_approved_score)),
+        "min_direct_passed_score": stats.min_direct_passed_score,
+    }
+
+
+def status_counts(stats):
+    return pd.DataFrame({
+        "observacion": STATUS_LABELS,
+        "count": [stats.n_approved, stats.n_failed, stats.n_absent]
+    })
+
+
+def histogram_frame(stats, view="all"):
+    # One row per (bin, label) with a non-zero count
+    data = stats.views[view]
+    edges = data["edges"]
+    frames = [
+        pd.DataFrame({
+            "bin_start": edges[:-1],
+            "bin_end": edges[1:],
+            "count": status["histogram"],
+            "observacion": label
+        })
+        for label, status in data["statuses"].items()
+    ]
+
+    if not frames:
+        return pd.DataFrame(columns=["bin_start", "bin_end", "count", "observacion"])
+
+    hist_df = pd.concat(frames, ignore_index=True)
+
+    return hist_df[ hist_df["count"] > 0 ]
+
+
+def summary_frame(stats, view="all"):
+    # Five-number summary of every label of a view
+    return pd.DataFrame(
+        [
+            {"observacion": label, **{key: status[key] for key in ["min", "q1", "median", "q3", "max"]}}
+            for label, status in stats.views[view]["statuses"].items()
+        ],
+        columns=["observacion", "min", "q1", "median", "q3", "max"]
+    )
+
+
+def top_scores(stats, k=TOP_K):
+    # Best approved scores, positions start at 1
+    scores = pd.Series(stats.top_scores[:k], name="Puntaje")
+    scores.index = scores.index + 1
+    scores.index.name = "Posición"
+
+    return scores
+
+
+def trend_from_stats(stats_by_year):
+    # The table load_trend returns, from CareerStats keyed by year
+    return pd.DataFrame(
+        [ [ getattr(stats, column) for column in TREND_COLUMNS ] for stats in stats_by_year.values() ],
+        index=pd.Index(list(stats_by_year), name="year"), columns=TREND_COLUMNS, dtype="float64"
+    )
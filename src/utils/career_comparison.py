@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+
+from src.utils.career_stats import ABSENT, year_masks
+from src.utils.instrumentation import timed
+
+PERCENTILES = [0.1, 0.25, 0.5, 0.75, 0.9]
+
+COMPARISON_COLUMNS = [
+    "total_applicants", "n_approved", "n_failed", "n_absent", "admission_rate",
+    "cutoff_score", "top_score", "mean_approved_score",
+    "min", "p10", "q1", "median", "q3", "p90", "max",
+]
+
+
+def _group_min(values, codes, n_groups):
+    result = np.full(n_groups, np.nan)
+    if len(values):
+        order = np.lexsort((values, codes))
+        first = np.unique(codes[order], return_index=True)
+        result[first[0]] = values[order][first[1]]
+
+    return result
+
+
+@timed("compare_careers")
+def compare_careers(df):
+    # One row per career file of a whole year (the "career" column), every aggregate is
+    # computed in a single pass over the year with the same definitions as CareerStats
+    masks = year_masks(df)
+    codes, names = pd.factorize(masks.careers, sort=True)
+    n_groups = len(names)
+
+    scores, has_score = masks.scores, masks.has_score
+    is_own, is_direct_passed, is_second_choice = masks.is_own, masks.is_direct_passed, masks.is_second_choice
+    is_failed = pd.isna(masks.observacion)
+    is_absent = masks.observacion == ABSENT
+
+    def group_count(mask):
+        return np.bincount(codes[mask], minlength=n_groups)
+
+    approved_codes = masks.approved(codes)
+    approved_scores = masks.approved(scores)
+    approved_counts = np.bincount(approved_codes, minlength=n_groups)
+    approved_sums = np.bincount(approved_codes, weights=approved_scores, minlength=n_groups)
+
+    result = pd.DataFrame({
+        "total_applicants": group_count(is_own),
+        "n_approved": group_count(is_direct_passed) + group_count(is_second_choice),
+        "n_failed": group_count(is_failed),
+        "n_absent": group_count(is_absent),
+    }, index=pd.Index(names, name="career"))
+
+    # Share of a career's own applicants that got one of its vacancies as first option
+    with np.errstate(invalid="ignore", divide="ignore"):
+        result["admission_rate"] = group_count(is_own & is_direct_passed) / result["total_applicants"].to_numpy()
+        result["mean_approved_score"] = approved_sums / approved_counts
+
+    result["cutoff_score"] = _group_min(scores[is_direct_passed & has_score], codes[is_direct_passed & has_score], n_groups)
+    result["top_score"] = -_group_min(-scores[has_score], codes[has_score], n_groups)
+
+    # Percentiles of every scored row of the career file, the "all" view of CareerStats
+    quantiles = (
+        pd.Series(scores[has_score]).groupby(codes[has_score])
+        .quantile([0.0, *PERCENTILES, 1.0])
+        .unstack()
+        .reindex(range(n_groups))
+    )
+    quantiles.columns = ["min", "p10", "q1", "median", "q3", "p90", "max"]
+    quantiles.index = result.index
+
+    result = result.join(quantiles)
+
+    # Files holding only second option rows are not careers anyone applied to that year
+    return result.loc[ result["total_applicants"] > 0, COMPARISON_COLUMNS ]
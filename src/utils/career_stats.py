@@ -0,0 +1,176 @@
+import math
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from src.utils.instrumentation import timed
+
+# Admission status definitions shared by every analysis
+DIRECT_PASSED = ["ALCANZO VACANTE", "ALCANZO VACANTE PRIMERA OPCIÓN"]
+SECOND_OPTION = "ALCANZO VACANTE SEGUNDA OPCIÓN"
+ABSENT = "AUSENTE"
+
+APPROVED_LABEL = "ALCANZO VACANTE"
+FAILED_LABEL = "NO ALCANZÓ VACANTE"
+SECOND_OPTION_LABEL = "SEGUNDA OPCIÓN"
+
+TOP_K = 10
+ALL_MAXBINS = 40        # Histogram of every applicant
+APPROVED_MAXBINS = 20   # Histogram of approved applicants
+
+
+def bin_edges(values, maxbins):
+    # Same "nice" bins Vega-Lite computes for bin=alt.Bin(maxbins=...), so bars line up
+    # with the ones Altair would draw from the raw rows
+    if len(values) == 0:
+        return np.array([])
+
+    start, stop = float(np.min(values)), float(np.max(values))
+    span = stop - start or abs(start) or 1.0
+
+    level = math.ceil(math.log10(maxbins))
+    step = 10 ** (math.floor(math.log10(span) + 0.5) - level)
+
+    while math.ceil(span / step) > maxbins:
+        step *= 10
+
+    for divisor in (5, 2):
+        if span / (step / divisor) <= maxbins:
+            step /= divisor
+
+    precision = 0 if math.log10(step) >= 0 else int(-math.log10(step)) + 1
+    eps = 10 ** (-precision - 1)
+
+    nice_start = math.floor(start / step + eps) * step
+    start = nice_start - step if start < nice_start else nice_start
+    stop = math.ceil(stop / step) * step
+    if stop <= start:
+        stop = start + step
+
+    return start + step * np.arange(round((stop - start) / step) + 1)
+
+
+def round_scores(df):
+    # Scores have at most 3 decimals, rounding removes float32 noise from the store
+    return np.round(df["puntaje"].to_numpy(dtype="float64"), 3)
+
+
+@dataclass(frozen=True)
+class YearMasks:
+    # Rows of a whole year, each in the career file of its "career" column
+    careers: np.ndarray
+    scores: np.ndarray
+    observacion: np.ndarray
+    has_score: np.ndarray
+    is_own: np.ndarray              # The career's own applicants
+    is_direct_passed: np.ndarray    # Got a vacancy as first option
+    is_second_choice: np.ndarray    # Got a vacancy of the career file as second option
+
+    def approved(self, values):
+        # Values of the scored approved rows, direct ones first. An applicant can be
+        # counted both as direct and second choice, as in CareerStats
+        return np.concatenate([
+            values[self.is_direct_passed & self.has_score],
+            values[self.is_second_choice & self.has_score],
+        ])
+
+
+def year_masks(df):
+    # The masks every per-career analysis of a year starts from, with CareerStats' definitions
+    careers = df["career"].astype("object").to_numpy()
+    scores = round_scores(df)
+    observacion = df["observacion"].astype("object").to_numpy()
+
+    return YearMasks(
+        careers=careers,
+        scores=scores,
+        observacion=observacion,
+        has_score=~np.isnan(scores),
+        is_own=df["carrera"].astype("object").to_numpy() == careers,
+        is_direct_passed=np.isin(observacion, DIRECT_PASSED),
+        is_second_choice=df["segunda_opcion"].astype("object").to_numpy() == careers,
+    )
+
+
+@dataclass(frozen=True)
+class CareerStats:
+    career: str
+    total_applicants: int
+    n_approved: int
+    n_failed: int
+    n_absent: int
+    top_score: float
+    min_direct_passed_score: float
+    mean_approved_score: float
+    min_approved_score: float
+    max_approved_score: float
+    top_scores: np.ndarray      # Best approved scores, descending
+    views: dict                 # "all" / "approved" -> {"edges": bin edges, "statuses": {label: summary}}
+
+
+def _summarize_view(scores, labels, maxbins):
+    # Five-number summary, mean and histogram counts per label; bins are shared by all labels
+    edges = bin_edges(scores, maxbins)
+    statuses = {}
+
+    for label in pd.unique(labels):
+        group = scores[labels == label]
+        q1, median, q3 = np.quantile(group, [0.25, 0.5, 0.75])
+        statuses[label] = {
+            "count": len(group),
+            "mean": float(group.mean()),
+            "min": float(group.min()),
+            "q1": float(q1),
+            "median": float(median),
+            "q3": float(q3),
+            "max": float(group.max()),
+            "histogram": np.histogram(group, bins=edges)[0],
+        }
+
+    return {"edges": edges, "statuses": statuses}
+
+
+@timed("compute_career_stats")
+def compute_career_stats(df, career, top_k=TOP_K):
+    # Every mask is computed once and every analysis is derived from them
+    scores = round_scores(df)
+    observacion = df["observacion"].to_numpy(dtype="object")
+
+    is_failed = df["observacion"].isna().to_numpy()
+    is_direct_passed = df["observacion"].isin(DIRECT_PASSED).to_numpy()
+    is_second_choice = (df["segunda_opcion"] == career).to_numpy()
+    has_score = ~np.isnan(scores)
+
+    # An applicant can be counted both as direct and second choice, as in the original analysis
+    approved_scores = np.concatenate([scores[is_direct_passed], scores[is_second_choice]])
+    approved_observacion = np.concatenate([observacion[is_direct_passed], observacion[is_second_choice]])
+    approved_has_score = ~np.isnan(approved_scores)
+
+    # Score distribution of every applicant
+    all_labels = np.where(is_failed, FAILED_LABEL, observacion)
+    all_labels = np.where(is_direct_passed | (all_labels == SECOND_OPTION), APPROVED_LABEL, all_labels)
+    all_view = _summarize_view(scores[has_score], all_labels[has_score], ALL_MAXBINS)
+
+    # Score distribution of approved applicants, split by option
+    approved_labels = np.where(np.isin(approved_observacion, DIRECT_PASSED), APPROVED_LABEL, approved_observacion)
+    approved_labels = np.where(approved_labels == SECOND_OPTION, SECOND_OPTION_LABEL, approved_labels)
+    approved_view = _summarize_view(approved_scores[approved_has_score], approved_labels[approved_has_score], APPROVED_MAXBINS)
+
+    valid_approved = approved_scores[approved_has_score]
+    direct_passed_scores = scores[is_direct_passed & has_score]
+
+    return CareerStats(
+        career=career,
+        total_applicants=int((df["carrera"] == career).sum()),
+        n_approved=len(approved_scores),
+        n_failed=int(is_failed.sum()),
+        n_absent=int((observacion == ABSENT).sum()),
+        top_score=float(scores[has_score].max()) if has_score.any() else np.nan,
+        min_direct_passed_score=float(direct_passed_scores.min()) if len(direct_passed_scores) else np.nan,
+        mean_approved_score=float(valid_approved.mean()) if len(valid_approved) else np.nan,
+        min_approved_score=float(valid_approved.min()) if len(valid_approved) else np.nan,
+        max_approved_score=float(valid_approved.max()) if len(valid_approved) else np.nan,
+        top_scores=np.sort(valid_approved)[::-1][:top_k],
+        views={"all": all_view, "approved": approved_view},
+    )
@@ -0,0 +1,238 @@
+import warnings
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from src.utils.career_stats import SECOND_OPTION, ABSENT, year_masks
+from src.utils.instrumentation import timed
+
+# Admissions of a year are decided in two rounds: every career fills its vacancies with
+# its own applicants in score order, then the vacancies left go to applicants who missed
+# their first option, in the order of their scores, in their second option. Only the
+# second options of applicants admitted through them are published, so only those
+# applicants can move between careers in a simulation
+
+BOOTSTRAP_DRAWS = 1000
+BOOTSTRAP_BATCH_SAMPLES = 2_000_000     # Bounds the memory of a bootstrap, not its result
+CONFIDENCE = 0.95
+
+
+@dataclass(frozen=True)
+class AdmissionPool:
+    careers: pd.Index           # Career files of the year, sorted
+    vacancies: np.ndarray       # Vacancies filled per career in both rounds
+    applicants: np.ndarray      # Own applicants per career, the bootstrap resamples as many
+    passing_score: float        # Lowest admitted score of the year, no one below it gets in
+    observed_cutoffs: np.ndarray
+    # Applicants at or above the passing score, by career and from best to worst score
+    scores: np.ndarray
+    career_codes: np.ndarray
+    second_codes: np.ndarray    # Published second option, -1 when there is none
+    bounds: np.ndarray          # Each career's run in the arrays above
+
+
+@timed("build_admission_pool")
+def build_admission_pool(df, passing_score=None):
+    # From the rows of each career's own applicants, in a single pass over the year. The
+    # passing score is the lowest admitted score unless given
+    masks = year_masks(df)
+    codes, names = pd.factorize(masks.careers, sort=True)
+    names = pd.Index(names, name="career")
+    n_careers = len(names)
+
+    is_own = masks.is_own
+    scores = masks.scores[is_own]
+    observacion = masks.observacion[is_own]
+    codes = codes[is_own]
+    second_codes = names.get_indexer(df["segunda_opcion"].astype("object").to_numpy()[is_own])
+
+    # Own rows, so a second choice is the applicant's (their row in the other career's file
+    # is what YearMasks.is_second_choice counts)
+    is_direct_passed = masks.is_direct_passed[is_own] & masks.has_score[is_own]
+    is_second_choice = (observacion == SECOND_OPTION) & (second_codes >= 0) & masks.has_score[is_own]
+    second_codes = np.where(is_second_choice, second_codes, -1)
+
+    if passing_score is None:
+        admitted_scores = scores[is_direct_passed | is_second_choice]
+        passing_score = float(admitted_scores.min()) if len(admitted_scores) else np.inf
+
+    vacancies = (
+        np.bincount(codes[is_direct_passed], minlength=n_careers)
+        + np.bincount(second_codes[is_second_choice], minlength=n_careers)
+    )
+
+    with np.errstate(invalid="ignore"):
+        is_eligible = (scores >= passing_score) & ~np.isin(observacion, [ABSENT, "ANULADO"])
+    observed_cutoffs = np.full(n_careers, np.inf)
+    np.minimum.at(observed_cutoffs, codes[is_direct_passed], scores[is_direct_passed])
+    observed_cutoffs[np.isinf(observed_cutoffs)] = np.nan
+
+    order = np.lexsort((-scores[is_eligible], codes[is_eligible]))
+    sorted_codes = codes[is_eligible][order]
+
+    return AdmissionPool(
+        careers=names,
+        vacancies=vacancies,
+        applicants=np.bincount(codes, minlength=n_careers),
+        passing_score=passing_score,
+        observed_cutoffs=observed_cutoffs,
+        scores=scores[is_eligible][order],
+        career_codes=sorted_codes,
+        second_codes=second_codes[is_eligible][order],
+        bounds=np.searchsorted(sorted_codes, np.arange(n_careers + 1)),
+    )
+
+
+def _runs(cell, n_cells):
+    # Length and start of every run of a sorted cell array, and each element's rank in its run
+    counts = np.bincount(cell, minlength=n_cells)
+    starts = np.cumsum(counts) - counts
+
+    return counts, starts, np.arange(len(cell)) - starts[cell]
+
+
+def _last_scores(scores, starts, n):
+    # Score of the n-th element of every run (the lowest admitted, runs go from best to worst)
+    result = np.full(len(starts), np.nan)
+    has = n > 0
+    result[has] = scores[starts[has] + n[has] - 1]
+
+    return result
+
+
+def _admit(pool, seats, group, position, second_options=True):
+    # Both rounds for many batches at once (scenarios or bootstrap draws). position are
+    # applicants of the pool and group their batch, sorted by batch and then by pool
+    # position, so every (batch, career) is a run from best to worst score. seats is
+    # (batches, careers). Returns (batches, careers) arrays
+    n_careers = len(pool.careers)
+    seats = np.maximum(seats, 0).ravel()
+
+    # First option: the best applicants of each run, as many as there are vacancies
+    cell = group * n_careers + pool.career_codes[position]
+    counts, starts, rank = _runs(cell, seats.size)
+    n_direct = np.minimum(counts, seats)
+    cutoffs = _last_scores(pool.scores[position], starts, n_direct)
+
+    # Second option: whoever missed the first competes for what the first round left
+    n_second = np.zeros(seats.size, dtype="int64")
+    second_cutoffs = np.full(seats.size, np.nan)
+    if second_options:
+        candidates = np.flatnonzero((rank >= seats[cell]) & (pool.second_codes[position] >= 0))
+        candidate_cell = group[candidates] * n_careers + pool.second_codes[position[candidates]]
+        candidate_scores = pool.scores[position[candidates]]
+
+        order = np.lexsort((-candidate_scores, candidate_cell))
+        candidate_counts, candidate_starts, _ = _runs(candidate_cell[order], seats.size)
+        n_second = np.minimum(candidate_counts, seats - n_direct)
+        second_cutoffs = _last_scores(candidate_scores[order], candidate_starts, n_second)
+
+    shape = (-1, n_careers)
+
+    return {
+        "admitted": n_direct.reshape(shape),
+        "admitted_second_option": n_second.reshape(shape),
+        "cutoff_score": cutoffs.reshape(shape),
+        "min_admitted_score": np.fmin(cutoffs, second_cutoffs).reshape(shape),
+    }
+
+
+def _seats(pool, vacancy_changes):
+    # Vacancies after a change: a number for every career or {career: change}
+    seats = pool.vacancies.copy()
+    if isinstance(vacancy_changes, dict):
+        for career, change in vacancy_changes.items():
+            seats[pool.careers.get_loc(career)] += change
+    elif vacancy_changes is not None:
+        seats += vacancy_changes
+
+    return np.maximum(seats, 0)
+
+
+def _whole_pool(pool, n_batches):
+    # Every applicant once in every batch
+    n = len(pool.scores)
+
+    return np.repeat(np.arange(n_batches), n), np.tile(np.arange(n), n_batches)
+
+
+@timed("simulate_cutoffs")
+def simulate_cutoffs(pool, vacancy_changes=None, second_options=True):
+    # Admissions of every career of the year after a change of vacancies, next to the
+    # observed cutoff. No change reproduces the published results
+    seats = _seats(pool, vacancy_changes)
+    result = _admit(pool, seats[None, :], *_whole_pool(pool, 1), second_options=second_options)
+
+    return pd.DataFrame({
+        "vacancies": seats,
+        **{ column: values[0] for column, values in result.items() },
+        "observed_cutoff_score": pool.observed_cutoffs,
+    }, index=pool.careers)
+
+
+@timed("vacancy_sweep")
+def vacancy_sweep(pool, career, changes, second_options=True):
+    # The career's admissions for each change of its vacancies, every other career as
+    # published. careers_affected counts the other careers whose admissions move through
+    # second options
+    code = pool.careers.get_loc(career)
+    changes = np.asarray(changes, dtype="int64")
+
+    seats = np.tile(pool.vacancies, (len(changes) + 1, 1))
+    seats[1:, code] += changes
+    result = _admit(pool, seats, *_whole_pool(pool, len(seats)), second_options=second_options)
+
+    admitted = result["admitted"] + result["admitted_second_option"]
+    min_admitted = np.nan_to_num(result["min_admitted_score"], nan=-np.inf)
+    moved = (admitted[1:] != admitted[0]) | (min_admitted[1:] != min_admitted[0])
+    moved[:, code] = False
+
+    return pd.DataFrame({
+        "vacancies": np.maximum(seats[1:, code], 0),
+        **{ column: values[1:, code] for column, values in result.items() },
+        "careers_affected": moved.sum(axis=1),
+    }, index=pd.Index(changes, name="vacancy_change"))
+
+
+@timed("bootstrap_cutoffs")
+def bootstrap_cutoffs(pool, vacancy_changes=None, draws=BOOTSTRAP_DRAWS, confidence=CONFIDENCE, seed=None, second_options=True):
+    # Confidence intervals of every career's simulated cutoff, resampling each career's
+    # applicants with replacement. Only applicants at or above the passing score can be
+    # admitted, so a draw only needs how many of them it takes from each career (binomial)
+    # and which ones (uniform). Draws go through _admit in batches of about
+    # BOOTSTRAP_BATCH_SAMPLES resampled applicants
+    rng = np.random.default_rng(seed)
+    n_careers = len(pool.careers)
+    eligible = np.diff(pool.bounds)
+    n = max(len(pool.scores), 1)
+    seats = _seats(pool, vacancy_changes)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        p_eligible = np.where(pool.applicants > 0, eligible / pool.applicants, 0)
+    taken = rng.binomial(pool.applicants, p_eligible, size=(draws, n_careers))
+
+    batch_draws = max(1, BOOTSTRAP_BATCH_SAMPLES // n)
+    results = []
+    for first in range(0, draws, batch_draws):
+        batch = taken[first:first + batch_draws]
+        cell = np.repeat(np.arange(batch.size), batch.ravel())
+        careers = cell % n_careers
+        position = pool.bounds[careers] + (rng.random(len(cell)) * eligible[careers]).astype("int64")
+
+        # Sorted by (draw, pool position) in a single sort of integer keys
+        group, position = np.divmod(np.sort(cell // n_careers * n + position), n)
+        results.append(_admit(pool, np.tile(seats, (len(batch), 1)), group, position, second_options=second_options))
+
+    result = { column: np.concatenate([ batch[column] for batch in results ]) for column in results[0] }
+
+    table = simulate_cutoffs(pool, vacancy_changes, second_options)
+    tail = (1 - confidence) / 2
+    with warnings.catch_warnings():
+        # Careers without admitted applicants in every draw have no interval
+        warnings.simplefilter("ignore", RuntimeWarning)
+        for column in ["cutoff_score", "min_admitted_score"]:
+            low, high = np.nanquantile(result[column], [tail, 1 - tail], axis=0)
+            table[f"{column}_low"], table[f"{column}_high"] = low, high
+
+    return table
@@ -0,0 +1,138 @@
+import os
+import json
+import hashlib
+from functools import lru_cache
+
+from src.utils.instrumentation import count
+
+PROCESSED_BASE_PATH = "data/processed"
+STORE_PATH = "data/store"
+INDEX_PATH = "data/index.json"
+
+
+def file_hash(filepath):
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def build_index(processed_base_path=PROCESSED_BASE_PATH, store_path=STORE_PATH, index_path=INDEX_PATH):
+    # pandas is only needed to count rows while building, never for lookups
+    from src.utils.data_store import read_processed_year
+
+    years = {}
+
+    for year in sorted(os.listdir(processed_base_path)):
+        year_path = os.path.join(processed_base_path, year)
+        if not os.path.isdir(year_path):
+            continue
+
+        df = read_processed_year(year, processed_base_path)
+        rows = df.groupby("career").size()
+        own_rows = df[df["carrera"] == df["career"]].groupby("career").size()
+
+        careers = {}
+        for career_file in sorted(os.listdir(year_path)):
+            if not career_file.endswith(".csv"):
+                continue
+
+            career = career_file.replace(".csv", "").split(f"{year}-", 1)[1]
+            filepath = os.path.join(year_path, career_file)
+            stat = os.stat(filepath)
+
+            careers[career] = {
+                "path": filepath,
+                "partition": os.path.join(store_path, f"year={year}"),
+                "rows": int(rows.get(career, 0)),
+                "own_rows": int(own_rows.get(career, 0)),
+                "bytes": stat.st_size,
+                "mtime": stat.st_mtime,
+                "sha256": file_hash(filepath),
+            }
+
+        years[year] = careers
+
+    # The version changes whenever any processed file changes
+    version = hashlib.sha256(
+        json.dumps({year: {career: entry["sha256"] for career, entry in careers.items()}
+                    for year, careers in years.items()}, sort_keys=True).encode("utf-8")
+    ).hexdigest()[:16]
+
+    index = {"version": version, "years": years}
+
+    tmp_path = f"{index_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(index, file, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, index_path)
+
+    return index
+
+
+@lru_cache(maxsize=4)
+def _read_index(index_path, mtime):
+    count("bytes_read.index", os.path.getsize(index_path))
+    with open(index_path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def get_index(index_path=INDEX_PATH):
+    try:
+        mtime = os.stat(index_path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+    return _read_index(index_path, mtime)
+
+
+# Without an index the catalog comes from directory listings, parsed once per process
+# and again only when a directory's mtime changes
+@lru_cache(maxsize=8)
+def _processed_years(processed_base_path, mtime):
+    return tuple(sorted(
+        year for year in os.listdir(processed_base_path)
+        if os.path.isdir(os.path.join(processed_base_path, year))
+    ))
+
+
+@lru_cache(maxsize=64)
+def _processed_careers(year_path, year, mtime):
+    return tuple(sorted(
+        file.split(".csv")[0].split(f"{year}-", 1)[1]
+        for file in os.listdir(year_path)
+        if file.endswith(".csv")
+    ))
+
+
+def list_years(index_path=INDEX_PATH):
+    index = get_index(index_path)
+    if index is not None:
+        return list(index["years"])
+
+    return list(_processed_years(PROCESSED_BASE_PATH, os.stat(PROCESSED_BASE_PATH).st_mtime_ns))
+
+
+def list_careers(year, index_path=INDEX_PATH):
+    index = get_index(index_path)
+    if index is not None:
+        return list(index["years"].get(year, {}))
+
+    year_path = os.path.join(PROCESSED_BASE_PATH, year)
+
+    return list(_processed_careers(year_path, year, os.stat(year_path).st_mtime_ns))
+
+
+def get_entry(year, career, index_path=INDEX_PATH):
+    index = get_index(index_path)
+    if index is None:
+        return None
+
+    return index["years"].get(year, {}).get(career)
+
+
+def data_version(index_path=INDEX_PATH):
+    index = get_index(index_path)
+
+    return index["version"] if index is not None else None
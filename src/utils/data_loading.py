@@ -0,0 +1,168 @@
+import os
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.utils.data_store import store_exists, read_year, read_processed_year, to_compact_frame, STORE_PATH, PROCESSED_BASE_PATH, COLUMNS
+from src.utils.data_index import get_index, get_entry, list_years, data_version
+from src.utils.career_stats import compute_career_stats
+from src.utils.career_comparison import compare_careers
+from src.utils.score_lookup import build_score_index, lookup_scores
+from src.utils.score_trend import approved_score_aggregates, cube_aggregates, career_trend
+from src.utils.cutoff_simulation import build_admission_pool, simulate_cutoffs, vacancy_sweep, bootstrap_cutoffs, BOOTSTRAP_DRAWS
+from src.utils.stats_cube import get_career_stats, get_cube
+from src.utils.instrumentation import timed, count, bind_trace
+
+YEAR_CACHE_SIZE = 16
+
+def _year_source(year):
+    # Prefer the consolidated Parquet store, fall back to the processed CSVs. Both are
+    # replaced atomically when rebuilt, which changes the directory's mtime
+    if store_exists():
+        return "store", os.stat(STORE_PATH).st_mtime_ns
+
+    return "csv", os.stat(os.path.join(PROCESSED_BASE_PATH, year)).st_mtime_ns
+
+@lru_cache(maxsize=YEAR_CACHE_SIZE)
+def _load_year(year, source):
+    count("cache.year.miss")
+
+    df = to_compact_frame(read_year(year) if source[0] == "store" else read_processed_year(year))
+
+    # Row range of every career file in the sorted frame
+    codes = df["career"].cat.codes.to_numpy()
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(codes) else np.array([], dtype=int)
+    stops = np.r_[starts[1:], len(codes)]
+    bounds = { df["career"].cat.categories[codes[start]]: (start, stop) for start, stop in zip(starts, stops) }
+
+    return df, bounds
+
+@timed("load_year")
+def load_year(year):
+    # The whole year as one compact frame, with the career file of every row in "career".
+    # It is shared by every caller and must not be modified
+    return _load_year(year, _year_source(year))[0]
+
+@timed("load_dataframe")
+def load_dataframe(year, career):
+    # A career is a slice of its year, loaded once per process
+    df, bounds = _load_year(year, _year_source(year))
+    if career not in bounds:
+        raise FileNotFoundError(f"No data for career {career} in year {year}")
+
+    start, stop = bounds[career]
+
+    return df.iloc[start:stop][COLUMNS].reset_index(drop=True)
+
+STATS_CACHE_SIZE = 256
+
+@lru_cache(maxsize=STATS_CACHE_SIZE)
+def _load_career_stats(year, career, version):
+    count("cache.career_stats.miss")
+
+    # Precomputed statistics cube first, the career's rows only when it isn't there
+    stats = get_career_stats(year, career)
+    if stats is None:
+        stats = compute_career_stats(load_dataframe(year, career), career)
+
+    return stats
+
+@timed("load_career_stats")
+def load_career_stats(year, career):
+    # Keyed on the data version so a rebuilt dataset is never served from stale entries
+    return _load_career_stats(year, career, data_version())
+
+SCORE_INDEX_CACHE_SIZE = 8
+
+@lru_cache(maxsize=SCORE_INDEX_CACHE_SIZE)
+def _load_score_index(year, version):
+    count("cache.score_index.miss")
+    return build_score_index(load_year(year))
+
+def lookup_scores_for(year, career, scores):
+    # Batch rank lookup against the career's presorted scores, built once per year and data version
+    index = _load_score_index(year, data_version()).get(career)
+    if index is None:
+        raise KeyError(f"No data for career {career} in year {year}")
+
+    return lookup_scores(index, scores)
+
+def lookup_score_for(year, career, score):
+    return lookup_scores_for(year, career, [score]).iloc[0].to_dict()
+
+ADMISSION_POOL_CACHE_SIZE = 8
+
+@lru_cache(maxsize=ADMISSION_POOL_CACHE_SIZE)
+def _load_admission_pool(year, version):
+    count("cache.admission_pool.miss")
+    return build_admission_pool(load_year(year))
+
+def _admission_pool(year, career=None):
+    pool = _load_admission_pool(year, data_version())
+    if career is not None and career not in pool.careers:
+        raise KeyError(f"No data for career {career} in year {year}")
+
+    return pool
+
+def simulate_cutoffs_for(year, vacancy_changes=None):
+    # Every career of the year after a change of vacancies, the pool is built once per year and data version
+    return simulate_cutoffs(_admission_pool(year), vacancy_changes)
+
+def vacancy_sweep_for(year, career, changes):
+    return vacancy_sweep(_admission_pool(year, career), career, changes)
+
+def bootstrap_cutoffs_for(year, vacancy_changes=None, draws=BOOTSTRAP_DRAWS, seed=None):
+    return bootstrap_cutoffs(_admission_pool(year), vacancy_changes, draws=draws, seed=seed)
+
+def passing_score_for(year):
+    # No one below it is admitted in a simulation, however many vacancies are left
+    return _admission_pool(year).passing_score
+
+TREND_CACHE_SIZE = 64
+TREND_WORKERS = 8
+
+# Shared by every session, its threads are started on first use and then reused
+_trend_executor = ThreadPoolExecutor(max_workers=TREND_WORKERS, thread_name_prefix="trend")
+
+@lru_cache(maxsize=TREND_CACHE_SIZE)
+def _load_year_aggregates(year, source, version):
+    count("cache.trend.miss")
+
+    # The cube already has them, the year's data is only read for years it doesn't cover
+    cube = get_cube()
+    if cube is not None and year in cube["years"]:
+        return cube_aggregates(cube["years"][year])
+
+    return approved_score_aggregates(load_year(year))
+
+@timed("load_trend")
+def load_trend(career):
+    # Approved score aggregates of a career for every year it had applicants. One table per
+    # year serves every career, the years not cached yet are built concurrently and their
+    # timings and cache misses go to the rerun's trace
+    version = data_version()
+    keys = [ (year, _year_source(year), version) for year in list_years() ]
+    tables = list(_trend_executor.map(bind_trace(lambda key: _load_year_aggregates(*key)), keys))
+
+    return career_trend({ key[0]: table for key, table in zip(keys, tables) }, career)
+
+@timed("career_exists_for_year")
+def career_exists_for_year(year, career):
+    # Answer from the processing index when available, without loading any data
+    if get_index() is not None:
+        entry = get_entry(year, career)
+
+        return entry is not None and entry["own_rows"] > 0
+
+    try:
+        temp_df = load_dataframe(year, career)
+
+        return career in temp_df["carrera"].unique()
+    
+    except FileNotFoundError:
+        return False
+
+def compare_careers_for(year):
+    # The year is read once and every career is aggregated in the same pass
+    return compare_careers(load_year(year))
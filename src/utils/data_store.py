@@ -0,0 +1,155 @@
+import os
+import shutil
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+
+from src.utils.instrumentation import count
+
+PROCESSED_BASE_PATH = "data/processed"
+STORE_PATH = "data/store"
+
+COLUMNS = ["id", "carrera", "puntaje", "vacante", "observacion", "segunda_opcion"]
+
+# Repeated strings are stored dictionary-encoded and read back as pandas categoricals.
+# "career" is the processed file the row belongs to: a career file also holds the
+# rows of applicants that entered it as their second option.
+STORE_SCHEMA = pa.schema([
+    ("career", pa.dictionary(pa.int32(), pa.string())),
+    ("id", pa.int64()),
+    ("carrera", pa.dictionary(pa.int32(), pa.string())),
+    ("puntaje", pa.float32()),
+    ("vacante", pa.float32()),
+    ("observacion", pa.dictionary(pa.int32(), pa.string())),
+    ("segunda_opcion", pa.dictionary(pa.int32(), pa.string())),
+])
+
+# In memory a year is one frame with the smallest types that hold the data. Career names
+# (the file, the applicant's career and the second option) share a single categorical
+# dtype per year, so comparing them compares integer codes
+FRAME_DTYPES = {
+    "id": "int32",
+    "puntaje": "float32",
+    "vacante": pd.ArrowDtype(pa.uint16()),
+}
+CAREER_COLUMNS = ["career", "carrera", "segunda_opcion"]
+
+
+def read_processed_year(year, processed_base_path=PROCESSED_BASE_PATH):
+    year_path = os.path.join(processed_base_path, year)
+    frames = []
+
+    for career_file in sorted(os.listdir(year_path)):
+        if not career_file.endswith(".csv"):
+            continue
+
+        career = career_file.replace(".csv", "").split(f"{year}-", 1)[1]
+        career_path = os.path.join(year_path, career_file)
+        df = pd.read_csv(career_path)
+        count("bytes_read.csv", os.path.getsize(career_path))
+        df.insert(0, "career", career)
+        frames.append(df)
+
+    if not frames:
+        return pd.DataFrame(columns=["career"] + COLUMNS)
+
+    return pd.concat(frames, ignore_index=True)
+
+
+def to_compact_frame(df):
+    # Works on the CSV frames and on the store's, which are already partly categorical
+    # astype wraps ids that don't fit around without an error, the other casts raise
+    id_range = np.iinfo(FRAME_DTYPES["id"])
+    if len(df) and not df["id"].between(id_range.min, id_range.max).all():
+        raise ValueError(f"Applicant ids outside the {FRAME_DTYPES['id']} range: {df['id'].min()} to {df['id'].max()}")
+
+    career_names = pd.unique(pd.concat([ df[column].astype("object") for column in CAREER_COLUMNS ]).dropna())
+    career_dtype = pd.CategoricalDtype(sorted(career_names))
+    observacion_dtype = pd.CategoricalDtype(sorted(df["observacion"].astype("object").dropna().unique()))
+
+    compact = df.astype(FRAME_DTYPES)
+    for column, dtype in [*[ (column, career_dtype) for column in CAREER_COLUMNS ], ("observacion", observacion_dtype)]:
+        # astype is a no-op between categoricals with the same categories in another order
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            compact[column] = df[column].cat.set_categories(dtype.categories)
+        else:
+            compact[column] = df[column].astype(dtype)
+
+    # Career files stay contiguous, so a career is a slice of its year
+    return compact.sort_values("career", kind="stable", ignore_index=True)
+
+
+def _to_table(df):
+    # Columns with no values at all (e.g. no second options in a year) are read as float
+    df = df.copy()
+    for column in ["career", "carrera", "observacion", "segunda_opcion"]:
+        df[column] = df[column].astype("object").where(df[column].notna(), None)
+
+    df = df.sort_values(["career", "id"], kind="stable")
+
+    return pa.Table.from_pandas(df[STORE_SCHEMA.names], schema=STORE_SCHEMA, preserve_index=False)
+
+
+def build_store(processed_base_path=PROCESSED_BASE_PATH, store_path=STORE_PATH):
+    # Write into a sibling directory first so readers never see a half-built store
+    tmp_path = f"{store_path}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+
+    for year in sorted(os.listdir(processed_base_path)):
+        if not os.path.isdir(os.path.join(processed_base_path, year)):
+            continue
+
+        table = _to_table(read_processed_year(year, processed_base_path))
+        ds.write_dataset(
+            table,
+            os.path.join(tmp_path, f"year={year}"),
+            format="parquet",
+            basename_template="part-{i}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+        )
+
+    shutil.rmtree(store_path, ignore_errors=True)
+    os.replace(tmp_path, store_path)
+    _open_store.cache_clear()
+
+
+def store_exists(store_path=STORE_PATH):
+    return os.path.isdir(store_path)
+
+
+@lru_cache(maxsize=4)
+def _open_store(store_path, mtime):
+    # Memory-map the Parquet files instead of reading them into Python buffers
+    filesystem = pafs.LocalFileSystem(use_mmap=True)
+
+    return ds.dataset(store_path, format="parquet", partitioning="hive", filesystem=filesystem)
+
+
+def open_store(store_path=STORE_PATH):
+    # The directory mtime changes when build_store swaps in a new store
+    return _open_store(os.path.abspath(store_path), os.stat(store_path).st_mtime_ns)
+
+
+def read_year(year, store_path=STORE_PATH):
+    # Every career file of a year in one scan of its partition
+    dataset = open_store(store_path)
+    partition = ds.field("year") == year
+    table = dataset.to_table(columns=["career"] + COLUMNS, filter=partition)
+
+    if table.num_rows == 0:
+        raise FileNotFoundError(f"No data for year {year}")
+
+    # Every column of the partition is read, so the bytes read are its files'
+    count("bytes_read.store", sum( os.path.getsize(fragment.path) for fragment in dataset.get_fragments(filter=partition) ))
+    df = table.to_pandas()
+
+    # The year is loaded once per process, give the scan's buffers back instead of
+    # keeping them in Arrow's pool for the life of the dashboard
+    del table
+    pa.default_memory_pool().release_unused()
+
+    return df
@@ -24,6 +24,45 @@ def generate_boxplot(df, x: str, y: str, x_axis_title: str, y_axis_title: str, t
 
     return boxplot
 
+def generate_binned_histogram(df, x: str, x2: str, y: str, x_axis_title: str, y_axis_title: str, title="", field_legend="", height=300):
+    # Histogram from precomputed bins (one row per bin and label), only the counts reach the browser
+    hist = alt.Chart(df).mark_bar().encode(
+        x=alt.X(x, title=x_axis_title, bin="binned"),
+        x2=alt.X2(x2),
+        y=alt.Y(y, title=y_axis_title),
+        color=alt.Color(field_legend, legend=alt.Legend(title="", orient="top-right", direction="horizontal"))
+    ).properties(
+        title=title,
+        height=height
+    )
+
+    return hist
+
+def generate_summary_boxplot(df, y: str, x_axis_title: str, y_axis_title: str, title="", height=300, field_legend="", sort=alt.Undefined):
+    # Min-max boxplot from precomputed "min", "q1", "median", "q3" and "max" columns, drawn
+    # with the same parts and defaults as mark_boxplot(extent="min-max", color="white")
+    base = alt.Chart(df).encode(
+        y=alt.Y(y, title=y_axis_title, sort=sort)
+    )
+
+    whiskers = base.mark_rule(color="white").encode(
+        x=alt.X("min:Q", title=x_axis_title).scale(zero=False),
+        x2="max:Q"
+    )
+    box = base.mark_bar(size=14).encode(
+        x="q1:Q",
+        x2="q3:Q",
+        color=alt.Color(field_legend, legend=None)
+    )
+    median = base.mark_tick(color="white", size=14).encode(x="median:Q")
+
+    boxplot = (whiskers + box + median).properties(
+        title=title,
+        height=height
+    )
+
+    return boxplot
+
 def generate_bar_chart(df, x, y, x_axis_title, y_axis_title, title="", height=180):
     bars = alt.Chart(df).mark_bar().encode(
         x=alt.X(x, title=x_axis_title),
@@ -1,45 +1,30 @@
 import pandas as pd
-import streamlit as st
 import altair as alt
 
-from src.utils.generate_plots import generate_histogram, generate_boxplot, generate_bar_chart
+from src.utils.generate_plots import generate_binned_histogram, generate_summary_boxplot, generate_bar_chart
+from src.utils.analysis_data import as_stats, kpis, status_counts, histogram_frame, summary_frame, top_scores, trend_from_stats
+from src.utils.data_loading import load_career_stats, load_trend
+from src.utils.instrumentation import timed, timer
 
-def load_dataframe(year, career):
-    filepath = f"data/processed/{year}/{year}-{career}.csv"
+KPI_LABELS = {
+    "total_applicants": "Número de postulantes",
+    "top_score": "Puntaje máximo",
+    "mean_approved_score": "Puntaje promedio de ingreso",
+    "min_direct_passed_score": "Puntaje mínimo para ingresar",
+}
 
-    return pd.read_csv(filepath)
-
-def career_exists_for_year(year, career):
-    try:
-        temp_df = load_dataframe(year, career)
-
-        return career in temp_df["carrera"].unique()
-    
-    except FileNotFoundError:
-        return False
-    
+@timed("generate_analysis")
 def generate_analysis(df, analysis_type="general", **kwargs):
     career = kwargs.get("career", None)
-    
-    # Additional dataframes
-    direct_passed_students = df[ df["observacion"].isin(["ALCANZO VACANTE", "ALCANZO VACANTE PRIMERA OPCIÓN"]) ]
-    second_choice_students = df[ df["segunda_opcion"] == career ]
-    approved_students = pd.concat([direct_passed_students, second_choice_students])
 
-    # Get desired metrics
-    total_applicants = df[ df["carrera"] == career ].shape[0]
-    n_approved_students = approved_students.shape[0]
-    n_failed_students = df["observacion"].isna().sum()
-    n_absent_students = df[ df["observacion"] == "AUSENTE"].shape[0]
+    if analysis_type == "trend_over_years":
+        stats = None
+    else:
+        stats = as_stats(df, career)
 
     if analysis_type == "general":
-        new_df = pd.DataFrame({
-            "observacion": ["ALCANZÓ VACANTE", "NO ALCANZÓ VACANTE", "AUSENTE"],
-            "count": [n_approved_students, n_failed_students, n_absent_students]
-        })
-
         general_analysis_chart = generate_bar_chart(
-            new_df,
+            status_counts(stats),
             x="count:Q",
             y="observacion:N",
             x_axis_title="Número de postulantes",
@@ -51,44 +36,25 @@ def generate_analysis(df, analysis_type="general", **kwargs):
         return general_analysis_chart
 
     elif analysis_type == "kpis":
-        top_score = df["puntaje"].max()
-        min_direct_passed_score = df[df["observacion"].isin(["ALCANZO VACANTE", "ALCANZO VACANTE PRIMERA OPCIÓN"]) ]["puntaje"].min()
-        mean_approved_score = approved_students["puntaje"].mean().round()
-
-        return {
-            "Número de postulantes": total_applicants,
-            "Puntaje máximo": top_score,
-            "Puntaje promedio de ingreso": mean_approved_score,
-            "Puntaje mínimo para ingresar": min_direct_passed_score
-        }
+        return { KPI_LABELS[key]: value for key, value in kpis(stats).items() }
 
     elif analysis_type == "score_range":
 
         # Histogram of total students
-        scores_hist_df = df[["puntaje", "observacion"]]
-        scores_hist_df["observacion"] = scores_hist_df["observacion"].fillna("NO ALCANZÓ VACANTE")
-        scores_hist_df = scores_hist_df.dropna(subset=["puntaje"])
-        scores_hist_df["observacion"] = scores_hist_df["observacion"].replace({
-            "ALCANZO VACANTE" and "ALCANZO VACANTE PRIMERA OPCIÓN": "ALCANZO VACANTE",
-            "ALCANZO VACANTE SEGUNDA OPCIÓN": "ALCANZO VACANTE",
-            "NO ALCANZÓ VACANTE": "NO ALCANZÓ VACANTE"
-        })
-
-        hist1 = generate_histogram(
-            scores_hist_df,
-            x="puntaje:Q",
-            y="count():Q",
+        hist1 = generate_binned_histogram(
+            histogram_frame(stats, "all"),
+            x="bin_start:Q",
+            x2="bin_end",
+            y="count:Q",
             x_axis_title="Puntaje",
             y_axis_title="Número de postulantes",
             title="",
-            maxbins=40,
             field_legend="observacion",
             height=400
         )
 
-        bp1 = generate_boxplot(
-            scores_hist_df,
-            x="puntaje:Q",
+        bp1 = generate_summary_boxplot(
+            summary_frame(stats, "all"),
             y="observacion:N",
             x_axis_title="Puntaje",
             y_axis_title="",
@@ -98,27 +64,20 @@ def generate_analysis(df, analysis_type="general", **kwargs):
         )
 
         # Histogram with approved students
-        scores_df = approved_students[["puntaje", "observacion"]]
-        scores_df["observacion"] = scores_df["observacion"].replace({
-            "ALCANZO VACANTE" and "ALCANZO VACANTE PRIMERA OPCIÓN": "ALCANZO VACANTE",
-            "ALCANZO VACANTE SEGUNDA OPCIÓN": "SEGUNDA OPCIÓN",
-        })
-
-        hist2 = generate_histogram(
-            scores_df,
-            x="puntaje:Q",
-            y="count():Q",
+        hist2 = generate_binned_histogram(
+            histogram_frame(stats, "approved"),
+            x="bin_start:Q",
+            x2="bin_end",
+            y="count:Q",
             x_axis_title="Puntaje",
             y_axis_title="Número de postulantes",
             title="",
-            maxbins=20,
             field_legend="observacion",
             height=400
         )
 
-        bp2 = generate_boxplot(
-            scores_df,
-            x="puntaje:Q",
+        bp2 = generate_summary_boxplot(
+            summary_frame(stats, "approved"),
             y="observacion:N",
             x_axis_title="Puntaje",
             y_axis_title="",
@@ -130,64 +89,21 @@ def generate_analysis(df, analysis_type="general", **kwargs):
         return hist1, hist2, bp1, bp2
     
     elif analysis_type == "top_10_scores":
-        top_10_scores = approved_students.sort_values("puntaje", ascending=False).loc[:, "puntaje"].head(10).reset_index(drop=True)
-        top_10_scores.index = top_10_scores.index + 1
-        top_10_scores.index.name = "Posición"
-        top_10_scores.name = "Puntaje"
-        
-        st.dataframe(
-            top_10_scores,
-            width=500,
-            column_config={
-                "Posición": st.column_config.TextColumn(
-                        "#",
-                ),
-                "Puntaje": st.column_config.ProgressColumn(
-                    "Puntaje",
-                    format="%f",
-                    min_value=600,
-                    max_value=max(top_10_scores)
-                )
-            }
-        )
+        # A Series indexed by position, the dashboard renders it as a table
+        return top_scores(stats)
 
     elif analysis_type == "trend_over_years":
-        dataframes = kwargs.get("dataframes", None)
-
-        df_direct_passed = {
-            year: dataframes[year][dataframes[year]["observacion"].isin(["ALCANZO VACANTE", "ALCANZO VACANTE PRIMERA OPCIÓN"])]
-            for year in dataframes.keys()
-        }
-        df_second_choice = {
-            year: dataframes[year][dataframes[year]["segunda_opcion"] == career]
-            for year in dataframes.keys()
-        }
-        df_approved = {
-            year: pd.concat([df_direct_passed[year], df_second_choice[year]])
-            for year in dataframes.keys()
-        }
-
-        # Find max, min and mean values
-        max_scores = {}
-        min_scores = {}
-        mean_scores = {}
-
-        for year, df in df_approved.items():
-            if not df.empty:
-                max_scores[year] = df["puntaje"].max()
-                min_scores[year] = df["puntaje"].min()
-                mean_scores[year] = df["puntaje"].mean()
-            else:
-                max_scores[year] = None
-                min_scores[year] = None
-                mean_scores[year] = None
+        # Per-year aggregates from load_trend, or frames / CareerStats keyed by year
+        trend = kwargs.get("trend", None)
+        if trend is None:
+            trend = trend_from_stats({ year: as_stats(data, career) for year, data in kwargs.get("dataframes", {}).items() })
 
         # New dataframe for computed scores filtering years out with any values
         trend_df = pd.DataFrame({
-            "Año": list(dataframes.keys()),
-            "Máximo": list(max_scores.values()),
-            "Mínimo": list(min_scores.values()),
-            "Promedio": list(mean_scores.values())
+            "Año": list(trend.index),
+            "Máximo": trend["max_approved_score"].to_numpy(),
+            "Mínimo": trend["min_approved_score"].to_numpy(),
+            "Promedio": trend["mean_approved_score"].to_numpy()
         }).dropna( subset=["Máximo", "Mínimo", "Promedio"] )
 
         # Reshape to long format
@@ -207,4 +123,73 @@ def generate_analysis(df, analysis_type="general", **kwargs):
         return trend_chart
         
     else:
-        raise ValueError(f"Invalid analysis type: {analysis_type}")
\ No newline at end of file
+        raise ValueError(f"Invalid analysis type: {analysis_type}")
+
+def generate_analysis_for(year, career, analysis_type="general"):
+    # Same as generate_analysis but driven by lightweight keys, the data is loaded here
+    with timer(f"analysis.{analysis_type}"):
+        if analysis_type == "trend_over_years":
+            return generate_analysis(None, analysis_type, career=career, trend=load_trend(career))
+
+        return generate_analysis(load_career_stats(year, career), analysis_type, career=career)
+
+RANKING_COLUMNS = {
+    "total_applicants": "Postulantes",
+    "n_approved": "Ingresantes",
+    "admission_rate": "Tasa de admisión",
+    "cutoff_score": "Puntaje mínimo",
+    "mean_approved_score": "Puntaje promedio de ingreso",
+    "top_score": "Puntaje máximo",
+    "p10": "Percentil 10",
+    "median": "Mediana",
+    "p90": "Percentil 90",
+}
+
+def generate_comparison(comparison_df, careers=None, sort_by="cutoff_score"):
+    # Ranking table and multi-career boxplot from the output of compare_careers
+    if careers:
+        comparison_df = comparison_df[ comparison_df.index.isin(careers) ]
+
+    comparison_df = comparison_df.sort_values(sort_by, ascending=False, na_position="last")
+
+    ranking_df = comparison_df[list(RANKING_COLUMNS)].rename(columns=RANKING_COLUMNS)
+    ranking_df.index.name = "Carrera"
+
+    # Only the five-number summaries reach the chart, boxes keep the ranking order
+    summary_df = comparison_df[["min", "q1", "median", "q3", "max"]].dropna().reset_index()
+
+    boxplot = generate_summary_boxplot(
+        summary_df,
+        y="career:N",
+        x_axis_title="Puntaje",
+        y_axis_title="",
+        title="Distribución de puntajes por carrera",
+        height=max(200, 22 * len(summary_df)),
+        field_legend="career:N",
+        sort=None
+    )
+
+    return ranking_df, boxplot
+
+def generate_vacancy_simulation(sweep, change=0):
+    # Simulated cutoff of a career for each change of its vacancies, from vacancy_sweep
+    sweep_df = pd.DataFrame({
+        "Cambio en vacantes": sweep.index,
+        "Primera opción": sweep["cutoff_score"].to_numpy(),
+        "Con segunda opción": sweep["min_admitted_score"].to_numpy()
+    }).melt(id_vars="Cambio en vacantes", var_name="Tipo de puntaje", value_name="Puntaje").dropna()
+
+    lines = alt.Chart(sweep_df).mark_line(point=True).encode(
+        x=alt.X("Cambio en vacantes:Q", title="Cambio en vacantes"),
+        y=alt.Y("Puntaje:Q", title="Puntaje mínimo", scale=alt.Scale(zero=False)),
+        color=alt.Color("Tipo de puntaje:N", title="Tipo de puntaje"),
+        tooltip=["Cambio en vacantes", "Tipo de puntaje", "Puntaje"]
+    )
+    selected = alt.Chart(pd.DataFrame({"Cambio en vacantes": [change]})).mark_rule(strokeDash=[4, 4]).encode(
+        x="Cambio en vacantes:Q"
+    )
+
+    return (lines + selected).properties(
+        title="Puntaje mínimo simulado según las vacantes",
+        height=250
+    )
@@ -0,0 +1,154 @@
+import os
+import sys
+import json
+import time
+import logging
+import threading
+from contextlib import nullcontext
+from functools import wraps
+
+# Tracing is off unless UNMSM_TRACE is set; when off every hook is a single boolean check
+_enabled = os.environ.get("UNMSM_TRACE", "") not in ("", "0", "false")
+_local = threading.local()
+_NULL_TIMER = nullcontext()
+
+logger = logging.getLogger("unmsm.trace")
+
+
+def _configure_logger():
+    # One JSON line per rerun on stderr, unless the app configured its own handlers
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+if _enabled:
+    _configure_logger()
+
+
+def is_enabled():
+    return _enabled
+
+def set_enabled(enabled):
+    global _enabled
+    _enabled = bool(enabled)
+    if _enabled:
+        _configure_logger()
+
+
+class Trace:
+    def __init__(self, name):
+        self.name = name
+        self.started = time.time()
+        self.start = time.perf_counter()
+        self.stages = {}        # stage -> [calls, seconds]
+        self.counters = {}
+        self.lock = threading.Lock()    # Worker threads of the rerun add to it too
+
+    def add_time(self, stage, seconds):
+        with self.lock:
+            entry = self.stages.setdefault(stage, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+
+    def incr(self, name, value=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def as_dict(self):
+        return {
+            "trace": self.name,
+            "started": self.started,
+            "total_ms": round((time.perf_counter() - self.start) * 1000, 3),
+            "stages": {
+                stage: {"calls": calls, "ms": round(seconds * 1000, 3)}
+                for stage, (calls, seconds) in self.stages.items()
+            },
+            "counters": self.counters,
+        }
+
+
+def start_trace(name="rerun"):
+    # Traces are per thread, Streamlit runs every session's script in its own thread
+    if not _enabled:
+        return None
+
+    _local.trace = Trace(name)
+
+    return _local.trace
+
+def current_trace():
+    return getattr(_local, "trace", None) if _enabled else None
+
+def end_trace():
+    trace = current_trace()
+    if trace is None:
+        return None
+
+    _local.trace = None
+    summary = trace.as_dict()
+    logger.info(json.dumps(summary, ensure_ascii=False))
+
+    return summary
+
+def bind_trace(func):
+    # func adds to the caller's trace from any thread, e.g. an executor's workers, which
+    # would otherwise have no trace of their own
+    trace = current_trace()
+    if trace is None:
+        return func
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        previous = getattr(_local, "trace", None)
+        _local.trace = trace
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _local.trace = previous
+
+    return wrapper
+
+
+class _Timer:
+    __slots__ = ("trace", "stage", "start")
+
+    def __init__(self, trace, stage):
+        self.trace = trace
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.trace.add_time(self.stage, time.perf_counter() - self.start)
+
+def timer(stage):
+    trace = current_trace()
+    if trace is None:
+        return _NULL_TIMER
+
+    return _Timer(trace, stage)
+
+
+def timed(stage):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+
+            with timer(stage):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def count(name, value=1):
+    trace = current_trace()
+    if trace is not None:
+        trace.incr(name, value)
@@ -0,0 +1,62 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from src.utils.career_stats import year_masks
+from src.utils.instrumentation import timed
+
+
+@dataclass(frozen=True)
+class ScoreIndex:
+    career: str
+    scores: np.ndarray          # Scores of the career's own applicants, ascending
+    cutoff_score: float         # Lowest score that got a vacancy as first option
+
+
+@timed("build_score_index")
+def build_score_index(df):
+    # One presorted score array per career file of a year, from a single sort of the year
+    masks = year_masks(df)
+    codes, names = pd.factorize(masks.careers, sort=True)
+
+    scores = masks.scores
+    is_own = masks.is_own & masks.has_score
+    is_direct_passed = masks.is_direct_passed & masks.has_score
+
+    order = np.lexsort((scores[is_own], codes[is_own]))
+    sorted_codes = codes[is_own][order]
+    sorted_scores = scores[is_own][order]
+    bounds = np.searchsorted(sorted_codes, np.arange(len(names) + 1))
+
+    cutoffs = np.full(len(names), np.inf)
+    np.minimum.at(cutoffs, codes[is_direct_passed], scores[is_direct_passed])
+
+    return {
+        career: ScoreIndex(
+            career=career,
+            scores=sorted_scores[bounds[i]:bounds[i + 1]],
+            cutoff_score=float(cutoffs[i]) if np.isfinite(cutoffs[i]) else np.nan,
+        )
+        for i, career in enumerate(names)
+    }
+
+
+def lookup_scores(index, scores):
+    # Rank (1 = best, ties share the rank), percentile (% of applicants at or below the
+    # score) and whether the score reaches the cutoff, for any number of scores at once
+    scores = np.round(np.asarray(scores, dtype="float64"), 3)
+    n_applicants = len(index.scores)
+
+    at_or_below = np.searchsorted(index.scores, scores, side="right")
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        percentile = 100 * at_or_below / n_applicants
+
+    return pd.DataFrame({
+        "score": scores,
+        "rank": n_applicants - at_or_below + 1,
+        "applicants": n_applicants,
+        "percentile": percentile,
+        "admitted": scores >= index.cutoff_score,
+    })
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+from src.utils.career_stats import year_masks
+from src.utils.career_comparison import _group_min
+from src.utils.instrumentation import timed
+
+TREND_COLUMNS = ["total_applicants", "max_approved_score", "min_approved_score", "mean_approved_score"]
+
+
+@timed("approved_score_aggregates")
+def approved_score_aggregates(df):
+    # Approved score aggregates of every career file of a year (the "career" column) in a
+    # single pass, with the same definitions as CareerStats
+    masks = year_masks(df)
+    codes, names = pd.factorize(masks.careers, sort=True)
+    n_groups = len(names)
+
+    approved_codes = masks.approved(codes)
+    approved_scores = masks.approved(masks.scores)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.bincount(approved_codes, weights=approved_scores, minlength=n_groups) / np.bincount(approved_codes, minlength=n_groups)
+
+    return pd.DataFrame({
+        "total_applicants": np.bincount(codes[masks.is_own], minlength=n_groups),
+        "max_approved_score": -_group_min(-approved_scores, approved_codes, n_groups),
+        "min_approved_score": _group_min(approved_scores, approved_codes, n_groups),
+        "mean_approved_score": mean,
+    }, index=pd.Index(names, name="career"))
+
+
+def cube_aggregates(entries):
+    # The same table from the precomputed cube entries of a year, no data is read
+    return pd.DataFrame.from_dict(
+        { career: { column: entry[column] for column in TREND_COLUMNS } for career, entry in entries.items() },
+        orient="index", columns=TREND_COLUMNS, dtype="float64",
+    ).rename_axis("career")
+
+
+def career_trend(aggregates_by_year, career):
+    # One row per year the career had applicants of its own, as career_exists_for_year.
+    # Tables are in TREND_COLUMNS order, as both functions above build them
+    years, rows = [], []
+    for year, aggregates in aggregates_by_year.items():
+        if career in aggregates.index:
+            row = aggregates.to_numpy(dtype="float64")[aggregates.index.get_loc(career)]
+            if row[0] > 0:
+                years.append(year)
+                rows.append(row)
+
+    return pd.DataFrame(
+        np.array(rows).reshape(len(rows), len(TREND_COLUMNS)),
+        index=pd.Index(years, name="year"), columns=TREND_COLUMNS,
+    ).astype({"total_applicants": "int64"})
@@ -0,0 +1,118 @@
+import os
+import json
+import math
+from functools import lru_cache
+
+import numpy as np
+
+from src.utils.career_stats import CareerStats, compute_career_stats
+from src.utils.instrumentation import count
+
+PROCESSED_BASE_PATH = "data/processed"
+CUBE_PATH = "data/stats_cube.json"
+
+SCALAR_FIELDS = [
+    "total_applicants", "n_approved", "n_failed", "n_absent", "top_score",
+    "min_direct_passed_score", "mean_approved_score", "min_approved_score", "max_approved_score",
+]
+
+
+def _number(value):
+    # JSON has no NaN
+    value = float(value)
+
+    return None if math.isnan(value) else value
+
+def _serialize(stats):
+    entry = { field: getattr(stats, field) for field in SCALAR_FIELDS }
+    for field in ["top_score", "min_direct_passed_score", "mean_approved_score", "min_approved_score", "max_approved_score"]:
+        entry[field] = _number(entry[field])
+
+    entry["top_scores"] = [ float(score) for score in stats.top_scores ]
+    entry["views"] = {
+        view: {
+            "edges": [ float(edge) for edge in data["edges"] ],
+            "statuses": {
+                label: {
+                    **{ key: _number(value) for key, value in status.items() if key not in ["count", "histogram"] },
+                    "count": int(status["count"]),
+                    "histogram": [ int(count) for count in status["histogram"] ],
+                }
+                for label, status in data["statuses"].items()
+            }
+        }
+        for view, data in stats.views.items()
+    }
+
+    return entry
+
+def _deserialize(career, entry):
+    scalars = {
+        field: np.nan if entry[field] is None else entry[field]
+        for field in SCALAR_FIELDS
+    }
+    views = {
+        view: {
+            "edges": np.array(data["edges"]),
+            "statuses": {
+                label: {**status, "histogram": np.array(status["histogram"])}
+                for label, status in data["statuses"].items()
+            }
+        }
+        for view, data in entry["views"].items()
+    }
+
+    return CareerStats(career=career, top_scores=np.array(entry["top_scores"]), views=views, **scalars)
+
+
+def build_cube(processed_base_path=PROCESSED_BASE_PATH, cube_path=CUBE_PATH):
+    from src.utils.data_store import read_processed_year
+    from src.utils.data_index import data_version
+
+    years = {}
+
+    for year in sorted(os.listdir(processed_base_path)):
+        if not os.path.isdir(os.path.join(processed_base_path, year)):
+            continue
+
+        # One read per year, then one CareerStats per career file
+        df = read_processed_year(year, processed_base_path)
+        years[year] = {
+            career: _serialize(compute_career_stats(career_df, career))
+            for career, career_df in df.groupby("career", sort=True)
+        }
+
+    cube = {"version": data_version(), "years": years}
+
+    tmp_path = f"{cube_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(cube, file, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, cube_path)
+
+    return cube
+
+
+@lru_cache(maxsize=2)
+def _read_cube(cube_path, mtime):
+    count("bytes_read.cube", os.path.getsize(cube_path))
+    with open(cube_path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def get_cube(cube_path=CUBE_PATH):
+    try:
+        mtime = os.stat(cube_path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+    return _read_cube(cube_path, mtime)
+
+
+def get_career_stats(year, career, cube_path=CUBE_PATH):
+    cube = get_cube(cube_path)
+    if cube is None:
+        return None
+
+    entry = cube["years"].get(year, {}).get(career)
+
+    return _deserialize(career, entry) if entry is not None else None
@@ -0,0 +1,49 @@
+import os, json, hashlib, threading
+
+HTTP_CACHE_PATH = "data/http_cache.json"
+
+
+class HttpCache:
+    # Validators (ETag / Last-Modified) and body hashes per URL, persisted as JSON
+    def __init__(self, path=HTTP_CACHE_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+
+        try:
+            with open(path, encoding="utf-8") as file:
+                self.entries = json.load(file)
+        except FileNotFoundError:
+            self.entries = {}
+
+    def conditional_headers(self, url):
+        entry = self.entries.get(url, {})
+        headers = {}
+
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+        return headers
+
+    def body_hash(self, url):
+        return self.entries.get(url, {}).get("sha256")
+
+    def update(self, url, response, body_hash):
+        with self.lock:
+            self.entries[url] = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "sha256": body_hash,
+            }
+
+    def save(self):
+        with self.lock:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(self.entries, file, indent=1)
+            os.replace(tmp_path, self.path)
+
+
+def content_hash(content: bytes):
+    return hashlib.sha256(content).hexdigest()
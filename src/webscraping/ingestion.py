@@ -0,0 +1,222 @@
+import os, json, time, argparse, threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+
+from src.webscraping.http_cache import HttpCache
+from src.webscraping.scraping_data import (
+    RateLimiter, create_session, fetch_page, parse_index, scrape_career, cache_path_for,
+    MAX_WORKERS, REQUESTS_PER_SECOND, CHANGED, UNCHANGED, FAILED,
+)
+
+RAW_BASE_PATH = "data/raw"
+INGESTION_STATE_PATH = "data/ingestion_state.json"
+
+BASE_URL = "https://admision.unmsm.edu.pe"
+PERIODS = ["1", "2"]            # Editions of a year, 2024-1 is Website20241
+
+CHECKPOINT_INTERVAL = 1.0       # Seconds between checkpoint writes while careers finish
+
+# Outcome of an edition
+DONE, PARTIAL, MISSING = "done", "partial", "missing"
+
+
+def edition_url(edition, base_url=BASE_URL):
+    year, period = edition.split("-")
+
+    return f"{base_url.rstrip('/')}/Website{year}{period}/A.html"
+
+
+def parse_editions(specs):
+    # "2024-1" or an inclusive range "2020-1..2025-2", in chronological order
+    editions = []
+    for spec in specs:
+        first, _, last = spec.partition("..")
+        last = last or first
+        start, end = tuple(first.split("-")), tuple(last.split("-"))
+        if start > end:
+            raise ValueError(f"Edition range {spec} ends before it starts")
+
+        for year in range(int(start[0]), int(end[0]) + 1):
+            for period in PERIODS:
+                if start <= (str(year), period) <= end and f"{year}-{period}" not in editions:
+                    editions.append(f"{year}-{period}")
+
+    return editions
+
+
+class IngestionState:
+    # Progress of every edition ingested so far, shared by all worker threads and written
+    # atomically so an interrupted job can always read it back
+    def __init__(self, path=INGESTION_STATE_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.saved_at = 0.0
+
+        try:
+            with open(path, encoding="utf-8") as file:
+                self.data = json.load(file)
+        except FileNotFoundError:
+            self.data = {"editions": {}}
+
+    def edition(self, edition):
+        return self.data["editions"].setdefault(edition, {"status": None, "careers": {}})
+
+    def status(self, edition):
+        return self.data["editions"].get(edition, {}).get("status")
+
+    def career_done(self, edition, career):
+        return self.data["editions"].get(edition, {}).get("careers", {}).get(career) in (CHANGED, UNCHANGED)
+
+    def set_status(self, edition, status, **fields):
+        with self.lock:
+            self.edition(edition).update(status=status, updated=time.time(), **fields)
+
+    def record_career(self, edition, career, status):
+        with self.lock:
+            self.edition(edition)["careers"][career] = status
+
+    def save(self, force=True):
+        # Between careers the file is rewritten at most once per CHECKPOINT_INTERVAL
+        with self.lock:
+            if not force and time.monotonic() - self.saved_at < CHECKPOINT_INTERVAL:
+                return False
+
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(self.data, file, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, self.path)
+            self.saved_at = time.monotonic()
+
+        return True
+
+
+def _fetch_index(session, rate_limiter, url):
+    return parse_index(fetch_page(session, url, rate_limiter), url)
+
+
+def run_ingestion(
+    editions, output_base_path=RAW_BASE_PATH, state_path=INGESTION_STATE_PATH, base_url=BASE_URL,
+    max_workers=MAX_WORKERS, requests_per_second=REQUESTS_PER_SECOND, use_cache=True, streaming=False, refresh=False,
+    cache_path=None,
+):
+    # Every page of every edition goes through the same pool of max_workers threads, the
+    # same session and the same per-host rate limit, however many editions are requested.
+    # Careers finished by a previous run are skipped unless refresh is set. Editions that
+    # were not published yet cost one index request per run until they are
+    state = IngestionState(state_path)
+    cache = HttpCache(cache_path or cache_path_for(output_base_path)) if use_cache else None
+    rate_limiter = RateLimiter(requests_per_second)
+
+    pending = [ edition for edition in editions if refresh or state.status(edition) != DONE ]
+    for edition in sorted(set(editions) - set(pending)):
+        print(f"{edition}: {state.status(edition)}, skipped")
+
+    summary = { edition: {CHANGED: 0, UNCHANGED: 0, FAILED: 0, "resumed": 0} for edition in pending }
+    indexes = {}
+
+    session = create_session(pool_size=max_workers)
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        index_futures = {
+            executor.submit(_fetch_index, session, rate_limiter, edition_url(edition, base_url)): edition
+            for edition in pending
+        }
+
+        # Career pages are queued as soon as their edition's index is in
+        career_futures = {}
+        for future in as_completed(index_futures):
+            edition = index_futures[future]
+            try:
+                careers = future.result()
+            except requests.exceptions.HTTPError as e:
+                # Ranges can include editions that were never published
+                status = MISSING if e.response is not None and e.response.status_code == 404 else PARTIAL
+                print(f"{edition}: index not available ({e})")
+                state.set_status(edition, status, url=edition_url(edition, base_url))
+                continue
+            except requests.exceptions.RequestException as e:
+                print(f"{edition}: index not available ({e})")
+                state.set_status(edition, PARTIAL, url=edition_url(edition, base_url))
+                continue
+            except Exception as e:
+                # The page is there but holds no index, like the notice put up before the
+                # results are. One edition's page doesn't stop the others
+                print(f"{edition}: index could not be parsed ({e!r})")
+                state.set_status(edition, MISSING, url=edition_url(edition, base_url))
+                continue
+
+            indexes[edition] = careers
+            state.set_status(edition, PARTIAL, url=edition_url(edition, base_url), careers_total=len(careers))
+
+            output_dir = os.path.join(output_base_path, edition)
+            os.makedirs(output_dir, exist_ok=True)
+
+            for career, career_url in careers:
+                filepath = os.path.join(output_dir, f"{edition}-{career}.csv")
+                if not refresh and state.career_done(edition, career) and os.path.exists(filepath):
+                    summary[edition]["resumed"] += 1
+                    continue
+
+                future = executor.submit(scrape_career, session, rate_limiter, career, career_url, filepath, cache, streaming)
+                career_futures[future] = (edition, career)
+
+        for future in as_completed(career_futures):
+            edition, career = career_futures[future]
+            status = future.result()
+            summary[edition][status] += 1
+            state.record_career(edition, career, status)
+
+            if state.save(force=False) and cache is not None:
+                cache.save()
+
+        # An edition is done once every career of its index has been written
+        for edition, careers in indexes.items():
+            if all( state.career_done(edition, career) for career, _ in careers ):
+                state.set_status(edition, DONE)
+
+    finally:
+        # Also on errors and interruptions: pages not started yet are dropped and the
+        # progress so far is saved, the next run resumes from here
+        executor.shutdown(cancel_futures=True)
+        session.close()
+        state.save()
+        if cache is not None:
+            cache.save()
+
+    for edition, counts in summary.items():
+        print(
+            f"{edition}: {state.status(edition)}, {counts[CHANGED]} changed, {counts[UNCHANGED]} unchanged,"
+            f" {counts[FAILED]} failed, {counts['resumed']} already done"
+        )
+
+    return { edition: state.status(edition) for edition in editions }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Download the result pages of several admission editions into data/raw, resuming interrupted runs.")
+    parser.add_argument("editions", nargs="+", help="Editions or inclusive ranges, e.g. 2024-1 2025-1 or 2020-1..2025-2")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="Pages fetched at the same time, across every edition")
+    parser.add_argument("--rate", type=float, default=REQUESTS_PER_SECOND, help="Requests per second to the results host")
+    parser.add_argument("--base-url", default=BASE_URL, help="Site the editions are published on")
+    parser.add_argument("--streaming", action="store_true", help="Parse each page while it downloads")
+    parser.add_argument("--refresh", action="store_true", help="Revalidate editions and careers already done")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore the saved ETag / Last-Modified validators")
+    args = parser.parse_args()
+
+    try:
+        editions = parse_editions(args.editions)
+    except ValueError as e:
+        parser.error(str(e))
+
+    try:
+        run_ingestion(
+            editions, base_url=args.base_url, max_workers=args.workers, requests_per_second=args.rate,
+            use_cache=not args.no_cache, streaming=args.streaming, refresh=args.refresh,
+        )
+    except KeyboardInterrupt:
+        print(f"Interrupted, progress saved to {INGESTION_STATE_PATH}. Run the same command again to resume")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+import os, json, hashlib, argparse, time
+from concurrent.futures import ProcessPoolExecutor
+
+from src.utils.data_store import build_store, read_processed_year, COLUMNS, STORE_PATH
+from src.utils.data_index import build_index, file_hash, INDEX_PATH
+from src.utils.stats_cube import build_cube, CUBE_PATH
+from src.webscraping.processing_data import redistribute_second_options, write_csv_atomic
+from src.webscraping.validation import validate_year, quarantine, format_report, QUARANTINE_BASE_PATH
+
+RAW_BASE_PATH = "data/raw"
+PROCESSED_BASE_PATH = "data/processed"
+STATE_PATH = "data/pipeline_state.json"
+
+# Stage graph. Every year runs its own chain, years are independent of each other
+# and run in separate processes; "build" fans in once all years are published:
+#
+#   ingest -> anonymize -> validate -> redistribute -> publish  (one chain per year)
+#                                                          \
+#                                                           build (store + index + statistics cube)
+#
+# validate sets aside rows that would skew the results in data/quarantine/<year>.csv
+
+
+def ingest(year, raw_base_path=RAW_BASE_PATH):
+    return read_processed_year(year, raw_base_path)
+
+def anonymize(df):
+    return df.drop( columns=["nombre_completo"], errors="ignore")
+
+def validate(df, year, quarantine_base_path=QUARANTINE_BASE_PATH):
+    # After anonymize, so quarantined rows carry no names
+    valid, quarantined, report = validate_year(df)
+    quarantine(quarantined, year, quarantine_base_path)
+
+    return valid, report
+
+def publish(df, year, processed_base_path=PROCESSED_BASE_PATH):
+    year_path = os.path.join(processed_base_path, year)
+    os.makedirs(year_path, exist_ok=True)
+
+    # Reading the whole year at once makes vacante a float everywhere. Each file keeps the
+    # integers it had when its rows were read file by file, unless a raw file they come from
+    # (the row's carrera) has applicants without a vacancy
+    is_own = df["carrera"] == df["career"]
+    has_blanks = df.loc[is_own, "vacante"].isna().groupby(df.loc[is_own, "career"]).any()
+
+    written = set()
+    for career, career_df in df.groupby("career", sort=False):
+        career_file = f"{year}-{career}.csv"
+        career_df = career_df[COLUMNS]
+        if not has_blanks.reindex(career_df["carrera"].unique(), fill_value=True).any():
+            career_df = career_df.astype({"vacante": "int64"})
+
+        write_csv_atomic(career_df, os.path.join(year_path, career_file))
+        written.add(career_file)
+
+    # Careers that are gone from the raw data must not linger in the dashboard
+    for career_file in os.listdir(year_path):
+        if career_file.endswith(".csv") and career_file not in written:
+            os.remove(os.path.join(year_path, career_file))
+
+
+YEAR_STAGES = ["ingest", "anonymize", "validate", "redistribute", "publish"]
+
+
+def directory_hash(path):
+    digest = hashlib.sha256()
+    for filename in sorted(os.listdir(path)):
+        if filename.endswith(".csv"):
+            digest.update(filename.encode("utf-8"))
+            digest.update(file_hash(os.path.join(path, filename)).encode("utf-8"))
+
+    return digest.hexdigest()
+
+
+def run_year(year, raw_base_path=RAW_BASE_PATH, processed_base_path=PROCESSED_BASE_PATH, quarantine_base_path=QUARANTINE_BASE_PATH):
+    timings = {}
+
+    start = time.perf_counter()
+    df = ingest(year, raw_base_path)
+    timings["ingest"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    df = anonymize(df)
+    timings["anonymize"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    df, report = validate(df, year, quarantine_base_path)
+    timings["validate"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    df = redistribute_second_options(df)
+    timings["redistribute"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    publish(df, year, processed_base_path)
+    timings["publish"] = time.perf_counter() - start
+
+    return directory_hash(os.path.join(processed_base_path, year)), timings, report
+
+
+def load_state(state_path=STATE_PATH):
+    try:
+        with open(state_path, encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+
+def save_state(state, state_path=STATE_PATH):
+    tmp_path = f"{state_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(state, file, indent=1)
+    os.replace(tmp_path, state_path)
+
+
+def is_up_to_date(year, input_hash, state, processed_base_path=PROCESSED_BASE_PATH):
+    # Skip only if the raw inputs are the same and nobody touched the outputs since
+    entry = state.get("years", {}).get(year)
+    year_path = os.path.join(processed_base_path, year)
+
+    return (
+        entry is not None
+        and entry["input"] == input_hash
+        and os.path.isdir(year_path)
+        and entry["output"] == directory_hash(year_path)
+    )
+
+
+def run_pipeline(years=None, workers=None, force=False, raw_base_path=RAW_BASE_PATH, processed_base_path=PROCESSED_BASE_PATH, state_path=STATE_PATH, quarantine_base_path=QUARANTINE_BASE_PATH):
+    state = load_state(state_path)
+    state.setdefault("years", {})
+
+    if years is None:
+        years = sorted(
+            year for year in os.listdir(raw_base_path)
+            if os.path.isdir(os.path.join(raw_base_path, year))
+        )
+
+    missing = [ year for year in years if not os.path.isdir(os.path.join(raw_base_path, year)) ]
+    if missing:
+        raise FileNotFoundError(f"No raw data for {', '.join(missing)} in {raw_base_path}")
+
+    input_hashes = { year: directory_hash(os.path.join(raw_base_path, year)) for year in years }
+    pending = [
+        year for year in years
+        if force or not is_up_to_date(year, input_hashes[year], state, processed_base_path)
+    ]
+
+    for year in sorted(set(years) - set(pending)):
+        print(f"{year}: up to date, skipped")
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                year: executor.submit(run_year, year, raw_base_path, processed_base_path, quarantine_base_path)
+                for year in pending
+            }
+
+            for year, future in futures.items():
+                output_hash, timings, report = future.result()
+                state["years"][year] = {"input": input_hashes[year], "output": output_hash, "validation": report}
+                print(f"{year}: " + ", ".join(f"{stage} {timings[stage]:.2f}s" for stage in YEAR_STAGES) + f" ({format_report(report)})")
+
+    # The store, the index and the cube cover every year, rebuild them when anything changed
+    outputs = [STORE_PATH, INDEX_PATH, CUBE_PATH]
+    if pending or force or not all(os.path.exists(path) for path in outputs):
+        start = time.perf_counter()
+        build_store(processed_base_path)
+        build_index(processed_base_path)
+        build_cube(processed_base_path)
+        print(f"build: {time.perf_counter() - start:.2f}s")
+
+    save_state(state, state_path)
+
+    return pending
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Process the raw admission results into the dashboard data.")
+    parser.add_argument("--years", nargs="+", help="Editions to process, e.g. 2024-1 2024-2 (default: all in data/raw)")
+    parser.add_argument("--workers", type=int, default=None, help="Processes used for the years (default: one per CPU)")
+    parser.add_argument("--force", action="store_true", help="Run every stage even if its inputs are unchanged")
+    args = parser.parse_args()
+
+    run_pipeline(years=args.years, workers=args.workers, force=args.force)
+
+
+if __name__ == "__main__":
+    main()
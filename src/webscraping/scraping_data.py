@@ -1,6 +1,11 @@
-from bs4 import BeautifulSoup
-import requests, csv, os
-from urllib.parse import urljoin
+import requests, csv, os, threading, time, codecs, hashlib
+from urllib.parse import urljoin, urlparse
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
+
+from src.webscraping.http_cache import HttpCache, content_hash
+from src.webscraping.table_parser import TableRowParser
 
 """
 urls = {
@@ -10,89 +15,274 @@ urls = {
 }
 """
 
-def get_careers( url: str ):
-    careers_list = []
+HEADERS = ["id", "nombre_completo", "carrera", "puntaje", "vacante", "observacion", "segunda_opcion"]
+
+MAX_WORKERS = 8             # Concurrent career pages being fetched
+REQUESTS_PER_SECOND = 10    # Per host
+MAX_ATTEMPTS = 4
+
+# Outcome of scraping a single career page
+CHANGED, UNCHANGED, FAILED = "changed", "unchanged", "failed"
+
+
+class RateLimiter:
+    # Spaces out requests to the same host, shared by all worker threads
+    def __init__(self, requests_per_second=REQUESTS_PER_SECOND):
+        self.interval = 1 / requests_per_second if requests_per_second else 0
+        self.next_slot = {}
+        self.lock = threading.Lock()
+
+    def wait(self, url):
+        if not self.interval:
+            return
+
+        host = urlparse(url).netloc
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(host, now))
+            self.next_slot[host] = slot + self.interval
+
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def create_session(pool_size=MAX_WORKERS):
+    # One keep-alive connection per worker instead of a new connection per page
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    return session
+
+
+def _is_retryable(exception):
+    if isinstance(exception, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True
+
+    if isinstance(exception, requests.exceptions.HTTPError) and exception.response is not None:
+        return exception.response.status_code == 429 or exception.response.status_code >= 500
+
+    return False
+
+
+@retry(
+    retry=retry_if_exception(_is_retryable),
+    stop=stop_after_attempt(MAX_ATTEMPTS),
+    wait=wait_exponential(multiplier=0.5, max=8),
+    reraise=True,
+)
+def fetch_response( session, url: str, rate_limiter=None, timeout=10, headers=None, stream=False ):
+    if rate_limiter is not None:
+        rate_limiter.wait(url)
+
+    response = session.get( url, timeout=timeout, headers=headers, stream=stream )
+    response.raise_for_status()
+    response.encoding = 'utf-8' # Avoiding language decodifitacion errors
+
+    return response
 
-    page = requests.get( url )
-    page.encoding = 'utf-8' # Avoiding language decodifitacion errors
+def fetch_page( session, url: str, rate_limiter=None, timeout=10 ):
+    return fetch_response( session, url, rate_limiter, timeout ).text
 
-    soup = BeautifulSoup( page.text, 'html.parser' )
+
+def parse_index( html: str, url: str ):
+    # Career names and result page links come from the same table, parse it once
+    # bs4 is imported on first use so importing this module stays cheap
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup( html, 'html.parser' )
     table = soup.find_all( 'table' )
-    tr_tags = table[0].find_all('tr')[1:]
 
-    for row in tr_tags:
+    careers_list = []
+    for row in table[0].find_all('tr')[1:]:
         single_row = row.find_all('td')
         row_value = [ data.text.strip() for data in single_row ]
         careers_list.append( *row_value )
 
-    return careers_list
-
-def get_career_data( url: str ):
-    careers_href_list = []
-
-    page = requests.get( url )
-    page.encoding = 'utf-8' # Avoiding language decodifitacion errors
-
     # Remove file path from the url
     base_url = url.rsplit( '/', 1 )[0] + '/'
 
-    soup = BeautifulSoup( page.text, 'html.parser' )
-    table = soup.find_all('table')
-    a_tags = table[0].find_all('a')[1:]
-
-    for a in a_tags:
+    careers_href_list = []
+    for a in table[0].find_all('a')[1:]:
         href_attr = a.get('href')
         if href_attr:
             full_url = urljoin( base_url, href_attr.lstrip('./') )
             careers_href_list.append(full_url)
 
-    return careers_href_list
+    return list( zip(careers_list, careers_href_list) )
+
+
+def get_careers( url: str ):
+    with create_session(pool_size=1) as session:
+        careers = parse_index( fetch_page(session, url), url )
+
+    return [ career for career, _ in careers ]
+
+def get_career_data( url: str ):
+    with create_session(pool_size=1) as session:
+        careers = parse_index( fetch_page(session, url), url )
+
+    return [ career_url for _, career_url in careers ]
+
 
+def parse_career_table( html: str ):
+    from bs4 import BeautifulSoup
 
-def get_career_info(url):
+    soup = BeautifulSoup(html, 'html.parser')
+    table = soup.find_all('table')
+
+    # Ensure the table exists
+    if not table:
+        return None
+
+    tr_tags = table[0].find_all('tr')[1:]
+
+    # Extract the data from the table
+    return [ [data.text.strip() for data in row.find_all('td')] for row in tr_tags ]
+
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def stream_career_table( chunks, file, encoding="utf-8" ):
+    # Parse the table while the page downloads and write each row as soon as it is closed,
+    # the output is the same as parse_career_table followed by csv.writer
+    writer = csv.writer(file)
+    writer.writerow(HEADERS)
+
+    parser = TableRowParser(writer.writerow)
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    hasher = hashlib.sha256()
+
+    for chunk in chunks:
+        hasher.update(chunk)
+        parser.feed(decoder.decode(chunk))
+
+    parser.feed(decoder.decode(b"", final=True))
+    parser.close()
+
+    return parser.found_table, hasher.hexdigest()
+
+
+def _scrape_career_streaming( response, career_url, filepath, cache, use_cache ):
+    # Written next to the previous CSV and swapped in only once the whole page is parsed
+    tmp_path = f"{filepath}.tmp"
+    try:
+        with open(tmp_path, mode="w", newline="", encoding="utf-8") as file:
+            found_table, body_hash = stream_career_table(response.iter_content(STREAM_CHUNK_SIZE), file, response.encoding)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    finally:
+        response.close()
+
+    if use_cache and body_hash == cache.body_hash(career_url):
+        os.remove(tmp_path)
+        cache.update(career_url, response, body_hash)
+        return UNCHANGED
+
+    if not found_table:
+        print(f"No table found for career: {career_url}")
+
+    os.replace(tmp_path, filepath)
+
+    if cache is not None:
+        cache.update(career_url, response, body_hash)
+
+    return CHANGED
+
+
+def scrape_career( session, rate_limiter, career, career_url, filepath, cache=None, streaming=False ):
+    # Only revalidate when there is a previous CSV to keep
+    use_cache = cache is not None and os.path.exists(filepath)
+    headers = cache.conditional_headers(career_url) if use_cache else None
+
+    # Fetch before opening the file so a failed request doesn't truncate previous data
+    try:
+        response = fetch_response(session, career_url, rate_limiter, headers=headers, stream=streaming)
+    except requests.exceptions.RequestException as e:
+        print(f"Error fetching data for {career}: {e}")
+        return FAILED
+
+    if response.status_code == 304:
+        response.close()
+        return UNCHANGED
+
+    if streaming:
+        try:
+            return _scrape_career_streaming(response, career_url, filepath, cache, use_cache)
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching data for {career}: {e}")
+            return FAILED
+
+    body_hash = content_hash(response.content)
+    if use_cache and body_hash == cache.body_hash(career_url):
+        cache.update(career_url, response, body_hash)
+        return UNCHANGED
+
+    rows = parse_career_table(response.text)
+    if rows is None:
+        print(f"No table found for career: {career_url}")
+        rows = []
+
+    # Written next to the previous CSV and swapped in whole, an interrupted run never
+    # leaves a truncated file behind
+    tmp_path = f"{filepath}.tmp"
+    with open(tmp_path, mode="w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(HEADERS)
+        writer.writerows(rows)
+    os.replace(tmp_path, filepath)
+
+    if cache is not None:
+        cache.update(career_url, response, body_hash)
+
+    return CHANGED
+
+
+def cache_path_for(output_base_path):
+    # The validators belong to the CSVs they were saved with, data/raw uses data/http_cache.json
+    return os.path.join(os.path.dirname(os.path.normpath(output_base_path)), "http_cache.json")
+
+
+def get_career_info(url, output_base_path="./data/raw", max_workers=MAX_WORKERS, requests_per_second=REQUESTS_PER_SECOND, use_cache=True, streaming=False, cache_path=None):
     edition_raw = url.split("/")[3][-5:]
     edition = f"{edition_raw[:4]}-{edition_raw[-1]}"
 
-    # Get the list of careers and their URLs
-    careers_list = get_careers(url)
-    careers_href_list = get_career_data(url)
-
     # Ensure the directory for the edition exists
-    output_dir = f"./data/raw/{edition}"
+    output_dir = os.path.join(output_base_path, edition)
     os.makedirs(output_dir, exist_ok=True)
 
-    for career, career_url in zip(careers_list, careers_href_list):
-        filepath = os.path.join(output_dir, f"{edition}-{career}.csv")
-
-        # Create the CSV file and write the headers
-        with open(filepath, mode="w", newline="", encoding="utf-8") as file:
-            writer = csv.writer(file)
-            headers = ["id", "nombre_completo", "carrera", "puntaje", "vacante", "observacion", "segunda_opcion"]
-            writer.writerow(headers)
-
-            # Fetch the data from the career URL
-            try:
-                response = requests.get(career_url, timeout=10)
-                response.encoding = "utf-8"
-
-                soup = BeautifulSoup(response.text, 'html.parser')
-                table = soup.find_all('table')
-
-                # Ensure the table exists
-                if table:
-                    tr_tags = table[0].find_all('tr')[1:]
-
-                    for row in tr_tags:
-                        # Extract the data from the table
-                        single_row = row.find_all('td')
-                        row_value = [data.text.strip() for data in single_row]
-                        writer.writerow(row_value)
-                else:
-                    print(f"No table found for career: {career_url}")
-            except requests.exceptions.RequestException as e:
-                print(f"Error fetching data for {career}: {e}")
-    
+    rate_limiter = RateLimiter(requests_per_second)
+    cache = HttpCache(cache_path or cache_path_for(output_base_path)) if use_cache else None
+
+    with create_session(pool_size=max_workers) as session:
+        # Get the list of careers and their URLs, the index is small so it is always fetched
+        careers = parse_index( fetch_page(session, url, rate_limiter), url )
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(
+                    scrape_career, session, rate_limiter, career, career_url,
+                    os.path.join(output_dir, f"{edition}-{career}.csv"), cache, streaming
+                )
+                for career, career_url in careers
+            ]
+            results = [ future.result() for future in futures ]
+
+    if cache is not None:
+        cache.save()
+
+    # Report the careers whose CSV was rewritten so processing can be limited to them
+    changed = [ career for (career, _), status in zip(careers, results) if status == CHANGED ]
+    print(f"{edition}: {len(changed)} changed, {results.count(UNCHANGED)} unchanged, {results.count(FAILED)} failed")
+
+    return changed
+
 
+# Several editions at once, resumable: python -m src.webscraping.ingestion 2024-1..2025-1
 # get_career_info( "https://admision.unmsm.edu.pe/Website20241/A.html" )
 # get_career_info( "https://admision.unmsm.edu.pe/Website20242/A.html" )
-# get_career_info( "https://admision.unmsm.edu.pe/Website20251/A.html" )
\ No newline at end of file
+# get_career_info( "https://admision.unmsm.edu.pe/Website20251/A.html" )
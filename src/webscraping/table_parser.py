@@ -0,0 +1,209 @@
+import re
+from html.entities import html5
+from html.parser import HTMLParser
+
+# Tags BeautifulSoup's html.parser builder never keeps open
+VOID_ELEMENTS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "keygen", "link", "menuitem",
+    "meta", "param", "source", "track", "wbr", "basefont", "bgsound", "command", "frame",
+    "image", "isindex", "nextid", "spacer",
+}
+
+# Strings inside these tags, at any depth, are not part of a cell's .text
+NON_TEXT_ELEMENTS = {"script", "style", "template", "rt", "rp"}
+
+# Inside these tags whitespace-only strings are kept as they are
+PRESERVE_WHITESPACE_ELEMENTS = {"pre", "textarea"}
+ASCII_SPACES = set(" \n\t\x0c\r")
+
+DECIMAL_REFERENCE = re.compile(r"([0-9]*)(.*)", re.DOTALL)
+HEX_REFERENCE = re.compile(r"([0-9a-fA-F]*)(.*)", re.DOTALL)
+
+
+def numeric_reference(codepoint):
+    # HTML's numeric character reference rules, as BeautifulSoup applies them
+    if codepoint == 0 or codepoint > 0x10FFFF or 0xD800 <= codepoint <= 0xDFFF:
+        return "�"
+
+    # C1 controls are usually Windows-1252 characters written with their byte value
+    if 0x80 <= codepoint <= 0x9F:
+        try:
+            return bytes([codepoint]).decode("windows-1252")
+        except UnicodeDecodeError:
+            pass
+
+    return chr(codepoint)
+
+
+class TableRowParser(HTMLParser):
+    """Event-driven equivalent of
+
+        table = BeautifulSoup(html, "html.parser").find_all("table")[0]
+        [ [td.text.strip() for td in tr.find_all("td")] for tr in table.find_all("tr")[1:] ]
+
+    Rows are passed to on_row as soon as they are closed, so memory depends on the size of a
+    row and not of the page. Open tags are tracked the way BeautifulSoup builds its tree: an
+    end tag closes everything opened after the matching start tag, unmatched end tags are
+    ignored, and rows or cells left open are nested in the enclosing ones. Strings are
+    decoded and whitespace is collapsed with BeautifulSoup's rules too.
+    """
+
+    def __init__(self, on_row):
+        # Character references are decoded below, the standard library decodes some differently
+        super().__init__(convert_charrefs=False)
+        self.on_row = on_row
+        self.found_table = False
+        self.done = False
+        self.stack = []             # Open tags of the document, until the first table is closed
+        self.table_depth = None     # Position of the first table in the stack
+        self.rows = []              # Cells of every row not emitted yet, in document order
+        self.open_rows = []
+        self.open_cells = []        # Text pieces of every cell still open
+        self.skipped_header = False
+        self.non_text_depth = 0
+        self.preserve_depth = 0
+        self.pending = []           # Text since the last tag, BeautifulSoup makes one string of it
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+
+        self._end_data()
+
+        if tag in VOID_ELEMENTS:
+            return
+
+        self.stack.append(tag)
+        self._enter(tag, 1)
+
+        if not self.found_table:
+            if tag == "table":
+                self.found_table = True
+                self.table_depth = len(self.stack) - 1
+
+            return
+
+        if tag == "tr":
+            # The first row of the table is its header
+            row = [] if self.skipped_header else None
+            self.skipped_header = True
+            self.rows.append(row)
+            self.open_rows.append(row)
+
+        elif tag == "td":
+            cell = []
+            self.open_cells.append(cell)
+            for row in self.open_rows:
+                if row is not None:
+                    row.append(cell)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_ELEMENTS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if self.done:
+            return
+
+        self._end_data()
+
+        # An end tag can also close the table through a tag opened before it
+        if tag not in self.stack:
+            return
+
+        while self.stack:
+            closed = self.stack.pop()
+            self._enter(closed, -1)
+
+            if self.table_depth is not None and len(self.stack) > self.table_depth:
+                if closed == "tr":
+                    self.open_rows.pop()
+                elif closed == "td":
+                    self.open_cells.pop()
+
+            if closed == tag:
+                break
+
+        if self.table_depth is not None:
+            self._flush()
+            self.done = len(self.stack) <= self.table_depth
+
+    def handle_data(self, data):
+        self.pending.append(data)
+
+    def handle_charref(self, name):
+        # Digits the reference ends with are left as text
+        base, pattern = (16, HEX_REFERENCE) if name[:1] in "xX" else (10, DECIMAL_REFERENCE)
+        digits, extra = pattern.match(name[1:] if base == 16 else name).groups()
+
+        if digits:
+            self.pending.append(numeric_reference(int(digits, base)))
+        else:
+            extra = name
+
+        if extra:
+            self.pending.append(extra)
+
+    def handle_entityref(self, name):
+        # Unknown entities are kept as written, without the semicolon
+        self.pending.append(html5.get(f"{name};", f"&{name}"))
+
+    def handle_comment(self, data):
+        self._end_data()
+
+    def handle_decl(self, decl):
+        self._end_data()
+
+    def handle_pi(self, data):
+        self._end_data()
+
+    def unknown_decl(self, data):
+        # CDATA sections are text too, even inside script, style or template
+        self._end_data()
+        if data.upper().startswith("CDATA["):
+            self.pending.append(data[len("CDATA["):])
+            self._end_data(always_text=True)
+
+    def close(self):
+        super().close()
+        self._end_data()
+
+        # Whatever is still open at the end of the page is closed, as in the parsed tree
+        while self.stack and not self.done:
+            self.handle_endtag(self.stack[-1])
+
+    def _enter(self, tag, step):
+        if tag in NON_TEXT_ELEMENTS:
+            self.non_text_depth += step
+        elif tag in PRESERVE_WHITESPACE_ELEMENTS:
+            self.preserve_depth += step
+
+    def _end_data(self, always_text=False):
+        if not self.pending:
+            return
+
+        data = "".join(self.pending)
+        self.pending.clear()
+
+        if self.done or not self.open_cells:
+            return
+
+        if self.preserve_depth == 0 and ASCII_SPACES.issuperset(data):
+            data = "\n" if "\n" in data else " "
+
+        # A nested cell's text is also part of every cell around it
+        if always_text or self.non_text_depth == 0:
+            for cell in self.open_cells:
+                cell.append(data)
+
+    def _flush(self):
+        # Rows are emitted in document order once no enclosing row is still open
+        if self.open_rows:
+            return
+
+        for row in self.rows:
+            if row is not None:
+                self.on_row([ "".join(cell).strip() for cell in row ])
+
+        self.rows.clear()
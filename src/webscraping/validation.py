@@ -0,0 +1,121 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.utils.career_stats import DIRECT_PASSED, SECOND_OPTION, ABSENT
+
+QUARANTINE_BASE_PATH = "data/quarantine"
+
+# Columns every row needs, and the ones a raw file may leave out (all of them empty)
+REQUIRED_COLUMNS = ["career", "id", "carrera", "puntaje"]
+OPTIONAL_COLUMNS = ["vacante", "observacion", "segunda_opcion"]
+
+OBSERVACION_VOCABULARY = [*DIRECT_PASSED, SECOND_OPTION, ABSENT, "ANULADO"]
+MIN_SCORE = 0
+MAX_SCORE = 2000
+
+
+class SchemaError(ValueError):
+    pass
+
+
+def _numeric(series):
+    # Values that are there but don't parse as numbers become NaN and are flagged
+    values = pd.to_numeric(series, errors="coerce")
+
+    return values, series.notna().to_numpy() & values.isna().to_numpy()
+
+
+def validate_year(df):
+    # Every check is a vectorized mask over the whole year, duplicate ids are found
+    # across every career file at once. Returns the valid rows, the quarantined rows with
+    # their reason and a report of what was found
+    missing_required = [ column for column in REQUIRED_COLUMNS if column not in df.columns ]
+    if missing_required:
+        raise SchemaError(f"Missing columns: {', '.join(missing_required)}")
+
+    missing = [ column for column in OPTIONAL_COLUMNS if column not in df.columns ]
+    df = df.assign(**{ column: np.nan for column in missing })
+
+    ids = pd.to_numeric(df["id"], errors="coerce")
+    scores, invalid_score = _numeric(df["puntaje"])
+    vacantes, invalid_vacante = _numeric(df["vacante"])
+
+    # Strings are compared through their codes, each distinct value is looked at once
+    observacion_codes, observacion_values = pd.factorize(df["observacion"])
+    # Missing values (code -1, the appended last entry) are not unknown statuses
+    is_known = np.append(np.isin(observacion_values, OBSERVACION_VOCABULARY), True)
+    career_codes, _ = pd.factorize(pd.concat([df["carrera"], df["career"]], ignore_index=True))
+    carrera_codes, career_codes = career_codes[:len(df)], career_codes[len(df):]
+
+    # In the order they are applied, a row is quarantined for the first check it fails
+    checks = {
+        "missing_id": ids.isna().to_numpy() | (ids.to_numpy() % 1 != 0),     # Absent or not an integer
+        "missing_carrera": carrera_codes == -1,
+        # Rows a previous run appended to a second option's file are not raw rows
+        "career_mismatch": (carrera_codes != -1) & (carrera_codes != career_codes),
+        "invalid_score": invalid_score,
+        "score_out_of_range": ((scores < MIN_SCORE) | (scores > MAX_SCORE)).to_numpy(),
+        "invalid_vacante": invalid_vacante | (vacantes < 1).to_numpy(),
+        "unknown_observacion": ~is_known[observacion_codes],
+    }
+
+    # The first row of an applicant is kept, among rows that passed the other checks
+    is_bad = np.logical_or.reduce(list(checks.values()))
+    checks["duplicate_id"] = ~is_bad & ids.where(~is_bad).duplicated(keep="first").to_numpy()
+    is_bad |= checks["duplicate_id"]
+
+    reason = np.select(list(checks.values()), list(checks), default="")
+
+    # Usually nothing is quarantined and the columns are already numeric, the year is
+    # then passed on without copying it
+    valid = df[~is_bad] if is_bad.any() else df
+    parsed = {}
+    if not pd.api.types.is_integer_dtype(df["id"]):
+        parsed["id"] = ids[~is_bad].astype("int64")
+    for column, values in [("puntaje", scores), ("vacante", vacantes)]:
+        if not pd.api.types.is_float_dtype(df[column]):
+            parsed[column] = values[~is_bad]
+    if parsed:
+        valid = valid.assign(**parsed)
+
+    quarantined = df[is_bad].assign(reason=reason[is_bad])
+
+    report = {
+        "rows": len(df),
+        "valid": len(valid),
+        "quarantined": { name: int(n) for name, n in pd.Series(reason[is_bad]).value_counts(sort=False).reindex(list(checks)).dropna().items() },
+        "missing_columns": missing,
+    }
+
+    return valid, quarantined, report
+
+
+def quarantine(quarantined, year, quarantine_base_path=QUARANTINE_BASE_PATH):
+    # Bad rows of a year are kept aside with their reason, the file is gone once the
+    # raw data is fixed
+    file_path = os.path.join(quarantine_base_path, f"{year}.csv")
+
+    if quarantined.empty:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+        return None
+
+    os.makedirs(quarantine_base_path, exist_ok=True)
+    tmp_path = f"{file_path}.tmp"
+    quarantined.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, file_path)
+
+    return file_path
+
+
+def format_report(report):
+    # One line for the pipeline's output
+    if not report["quarantined"]:
+        return f"{report['rows']} rows valid"
+
+    reasons = ", ".join(f"{name} {n}" for name, n in report["quarantined"].items())
+
+    return f"{report['valid']}/{report['rows']} rows valid, quarantined: {reasons}"
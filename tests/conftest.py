@@ -0,0 +1,74 @@
+import os, sys, time, threading
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from urllib.parse import urlsplit
+
+import pytest
+
+REPO_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, REPO_PATH)
+
+FIXTURES_PATH = os.path.join(os.path.dirname(__file__), "fixtures")
+SITE_PATH = os.path.join(FIXTURES_PATH, "site")
+
+
+class FixtureHandler(SimpleHTTPRequestHandler):
+    # Serves tests/fixtures/site, answering with the statuses queued for a path first
+    def do_GET(self):
+        site = self.server.site
+        path = urlsplit(self.path).path
+
+        with site.lock:
+            site.requests.append((path, self.headers.get("Host"), time.monotonic()))
+            faults = site.faults.get(path)
+            status = faults.pop(0) if faults else None
+
+        if status is not None:
+            self.send_error(status)
+            return
+
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureSite:
+    def __init__(self, server):
+        self.server = server
+        self.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        self.requests = []      # (path, Host header, monotonic time) of every request
+        self.faults = {}        # path -> statuses returned before the page is served
+        self.lock = threading.Lock()
+
+    def url(self, path):
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def hits(self, path):
+        return sum( 1 for requested, _, _ in self.requests if requested == path )
+
+    def fail(self, path, *statuses):
+        self.faults[path] = list(statuses)
+
+
+@pytest.fixture
+def site():
+    # A local stand-in for the admission results site
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(FixtureHandler, directory=SITE_PATH))
+    server.daemon_threads = True
+    server.site = FixtureSite(server)
+    threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+
+    yield server.site
+
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def no_retry_wait(monkeypatch):
+    # Retries happen right away instead of backing off for seconds
+    from tenacity import wait_none
+    from src.webscraping.scraping_data import fetch_response
+
+    monkeypatch.setattr(fetch_response.retry, "wait", wait_none())
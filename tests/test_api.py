@@ -0,0 +1,212 @@
+import os, json, shutil, threading
+from http.client import HTTPConnection
+from urllib.parse import urlencode
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import REPO_PATH
+from src.api.server import serve
+from src.utils.career_stats import DIRECT_PASSED, SECOND_OPTION
+from src.utils.data_store import build_store, PROCESSED_BASE_PATH
+from src.utils.data_index import build_index
+from src.utils.stats_cube import build_cube
+
+YEAR = "2024-1"
+CAREER = "MEDICINA HUMANA"
+YEARS = sorted(os.listdir(os.path.join(REPO_PATH, PROCESSED_BASE_PATH)))
+
+
+def build_data(path):
+    # The repository's processed data and everything the pipeline builds from it
+    shutil.copytree(os.path.join(REPO_PATH, PROCESSED_BASE_PATH), path / PROCESSED_BASE_PATH)
+    build_store()
+    build_index()
+    build_cube()
+
+
+@pytest.fixture(scope="module")
+def data_path(tmp_path_factory):
+    path = tmp_path_factory.mktemp("api")
+    cwd = os.getcwd()
+    os.chdir(path)
+    try:
+        build_data(path)
+    finally:
+        os.chdir(cwd)
+
+    return path
+
+
+@pytest.fixture
+def api(data_path, monkeypatch):
+    monkeypatch.chdir(data_path)
+
+    server = serve(port=0)
+    threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+    connection = HTTPConnection("127.0.0.1", server.server_address[1])
+
+    def get(path, params=None, headers=None):
+        connection.request("GET", f"{path}?{urlencode(params)}" if params else path, headers=headers or {})
+        response = connection.getresponse()
+        body = response.read()
+
+        return response.status, json.loads(body) if body else None, response.getheader("ETag")
+
+    yield get
+
+    connection.close()
+    server.shutdown()
+    server.server_close()
+
+
+def career_rows(year, career):
+    return pd.read_csv(os.path.join(REPO_PATH, PROCESSED_BASE_PATH, year, f"{year}-{career}.csv"))
+
+
+def test_years_and_careers(api):
+    assert api("/api/years")[:2] == (200, {"years": YEARS})
+
+    status, body, _ = api("/api/careers", {"year": YEAR})
+    files = os.listdir(os.path.join(REPO_PATH, PROCESSED_BASE_PATH, YEAR))
+    assert status == 200
+    assert body["year"] == YEAR
+    assert sorted(body["careers"]) == sorted( name[len(YEAR) + 1:-len(".csv")] for name in files )
+
+
+def test_kpis(api):
+    df = career_rows(YEAR, CAREER)
+    direct = df.loc[df["observacion"].isin(DIRECT_PASSED), "puntaje"]
+    approved = pd.concat([direct, df.loc[df["segunda_opcion"] == CAREER, "puntaje"]]).dropna()
+
+    status, body, _ = api("/api/kpis", {"year": YEAR, "career": CAREER})
+
+    assert status == 200
+    assert body == {
+        "total_applicants": int((df["carrera"] == CAREER).sum()),
+        "top_score": pytest.approx(df["puntaje"].max()),
+        "mean_approved_score": round(approved.mean()),
+        "min_direct_passed_score": pytest.approx(direct.min()),
+    }
+
+
+def test_distribution(api):
+    df = career_rows(YEAR, CAREER)
+
+    status, body, _ = api("/api/distribution", {"year": YEAR, "career": CAREER})
+
+    assert status == 200
+    counts = { status["observacion"]: status["count"] for status in body["statuses"] }
+    assert counts["NO ALCANZÓ VACANTE"] == int(df["observacion"].isna().sum())
+    assert counts["AUSENTE"] == int((df["observacion"] == "AUSENTE").sum())
+
+
+@pytest.mark.parametrize("view", ["all", "approved"])
+def test_histogram(api, view):
+    df = career_rows(YEAR, CAREER)
+    scored = df["puntaje"].notna()
+    expected = int(scored.sum()) if view == "all" else int((scored & (df["observacion"].isin(DIRECT_PASSED) | (df["segunda_opcion"] == CAREER))).sum())
+
+    status, body, _ = api("/api/histogram", {"year": YEAR, "career": CAREER, "view": view})
+
+    assert status == 200
+    assert body["view"] == view
+    assert sum( row["count"] for row in body["bins"] ) == expected
+    assert all( row["bin_start"] < row["bin_end"] for row in body["bins"] )
+    assert { row["observacion"] for row in body["summary"] } == { row["observacion"] for row in body["bins"] }
+
+
+def test_top(api):
+    df = career_rows(YEAR, CAREER)
+    approved = df.loc[df["observacion"].isin([*DIRECT_PASSED, SECOND_OPTION]) | (df["segunda_opcion"] == CAREER), "puntaje"]
+
+    status, body, _ = api("/api/top", {"year": YEAR, "career": CAREER, "k": 3})
+
+    assert status == 200
+    np.testing.assert_allclose(body["scores"], approved.sort_values(ascending=False).to_numpy()[:3], atol=1e-3)
+
+
+def test_trend(api):
+    status, body, _ = api("/api/trend", {"career": CAREER})
+
+    assert status == 200
+    assert body["career"] == CAREER
+    assert [ row["year"] for row in body["years"] ] == YEARS
+    for row in body["years"]:
+        df = career_rows(row["year"], CAREER)
+        assert row["total_applicants"] == int((df["carrera"] == CAREER).sum())
+
+
+@pytest.mark.parametrize("path, params, message", [
+    ("/api/careers", {}, "Missing parameter: year"),
+    ("/api/kpis", {"year": YEAR}, "Missing parameter: career"),
+    ("/api/trend", {}, "Missing parameter: career"),
+    ("/api/histogram", {"year": YEAR, "career": CAREER, "view": "some"}, "Invalid view"),
+    ("/api/top", {"year": YEAR, "career": CAREER, "k": "ten"}, "k must be an integer"),
+    ("/api/top", {"year": YEAR, "career": CAREER, "k": 11}, "k must be between"),
+    ("/api/top", {"year": YEAR, "career": CAREER, "k": 0}, "k must be between"),
+])
+def test_bad_request(api, path, params, message):
+    status, body, etag = api(path, params)
+
+    assert status == 400
+    assert message in body["error"]
+    assert etag is None
+
+
+@pytest.mark.parametrize("path, params", [
+    ("/api/nope", {}),
+    ("/api/careers", {"year": "2099-1"}),
+    ("/api/kpis", {"year": "2099-1", "career": CAREER}),
+    ("/api/kpis", {"year": YEAR, "career": "NO EXISTE"}),
+    ("/api/distribution", {"year": YEAR, "career": "NO EXISTE"}),
+    ("/api/histogram", {"year": YEAR, "career": "NO EXISTE"}),
+    ("/api/top", {"year": YEAR, "career": "NO EXISTE"}),
+    ("/api/trend", {"career": "NO EXISTE"}),
+])
+@pytest.mark.parametrize("if_none_match", [None, "*"])
+def test_not_found(api, path, params, if_none_match):
+    # A resource that doesn't exist is never "not modified"
+    status, body, _ = api(path, params, {"If-None-Match": if_none_match} if if_none_match else None)
+
+    assert status == 404
+    assert "error" in body
+
+
+def test_etag_round_trip(api):
+    params = {"year": YEAR, "career": CAREER}
+    status, body, etag = api("/api/kpis", params)
+    assert status == 200 and etag
+
+    assert api("/api/kpis", params, {"If-None-Match": etag}) == (304, None, etag)
+    assert api("/api/kpis", params, {"If-None-Match": f'"other", W/{etag}'})[0] == 304
+    assert api("/api/kpis", params, {"If-None-Match": '"other"'}) == (200, body, etag)
+
+    # Every resource has its own tag
+    assert api("/api/kpis", {"year": YEAR, "career": "DERECHO"})[2] != etag
+
+
+def test_rebuilt_data_changes_the_etag(api, tmp_path, monkeypatch):
+    params = {"year": YEAR, "career": CAREER}
+    _, body, etag = api("/api/kpis", params)
+
+    # The server now answers from a copy of the data the other tests don't share
+    monkeypatch.chdir(tmp_path)
+    build_data(tmp_path)
+
+    # Another applicant of the career, with the best score of the year
+    csv_path = tmp_path / PROCESSED_BASE_PATH / YEAR / f"{YEAR}-{CAREER}.csv"
+    with open(csv_path, "a", newline="", encoding="utf-8") as file:
+        file.write(f"999999,{CAREER},1999.000,,,\r\n")
+
+    build_store()
+    build_index()
+    build_cube()
+
+    status, new_body, new_etag = api("/api/kpis", params, {"If-None-Match": etag})
+
+    assert status == 200
+    assert new_etag != etag
+    assert new_body["total_applicants"] == body["total_applicants"] + 1
+    assert new_body["top_score"] == 1999.0
@@ -0,0 +1,68 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import REPO_PATH
+from src.utils.career_stats import SECOND_OPTION, year_masks
+from src.utils.cutoff_simulation import build_admission_pool, simulate_cutoffs, bootstrap_cutoffs
+from src.utils.data_store import read_processed_year, to_compact_frame, PROCESSED_BASE_PATH
+
+YEARS = sorted(os.listdir(os.path.join(REPO_PATH, PROCESSED_BASE_PATH)))
+
+
+@pytest.fixture(scope="module", params=YEARS)
+def year_frame(request):
+    return to_compact_frame(read_processed_year(request.param, os.path.join(REPO_PATH, PROCESSED_BASE_PATH)))
+
+
+def published_admissions(df):
+    # Admissions of every career file as published: its own applicants admitted as first
+    # option and the applicants of other careers admitted through it as second option
+    masks = year_masks(df)
+    observacion = masks.observacion
+    is_direct = masks.is_own & masks.is_direct_passed & masks.has_score
+    is_second = masks.is_second_choice & (observacion == SECOND_OPTION) & masks.has_score
+
+    careers = pd.Index(sorted(pd.unique(masks.careers)), name="career")
+    direct = pd.Series(masks.scores[is_direct]).groupby(masks.careers[is_direct])
+    second = pd.Series(masks.scores[is_second]).groupby(masks.careers[is_second])
+
+    return pd.DataFrame({
+        "admitted": direct.size().reindex(careers, fill_value=0),
+        "admitted_second_option": second.size().reindex(careers, fill_value=0),
+        "cutoff_score": direct.min().reindex(careers),
+        "min_admitted_score": np.fmin(direct.min().reindex(careers), second.min().reindex(careers)),
+    })
+
+
+def test_no_change_reproduces_the_published_results(year_frame):
+    pool = build_admission_pool(year_frame)
+    simulation = simulate_cutoffs(pool)
+    published = published_admissions(year_frame)
+
+    pd.testing.assert_index_equal(simulation.index, published.index)
+    for column in published.columns:
+        np.testing.assert_array_equal(simulation[column].to_numpy(), published[column].to_numpy(), err_msg=column)
+
+    np.testing.assert_array_equal(simulation["cutoff_score"].to_numpy(), simulation["observed_cutoff_score"].to_numpy())
+    np.testing.assert_array_equal(simulation["vacancies"].to_numpy(), (published["admitted"] + published["admitted_second_option"]).to_numpy())
+
+
+def test_more_vacancies_never_raise_a_cutoff(year_frame):
+    pool = build_admission_pool(year_frame)
+    published = simulate_cutoffs(pool)
+    simulation = simulate_cutoffs(pool, 5)
+
+    has_cutoff = published["cutoff_score"].notna()
+    assert (simulation.loc[has_cutoff, "cutoff_score"] <= published.loc[has_cutoff, "cutoff_score"]).all()
+    # No one below the passing score gets in, whatever is left
+    assert (simulation["min_admitted_score"].dropna() >= pool.passing_score).all()
+
+
+def test_bootstrap_keeps_the_simulated_admissions(year_frame):
+    pool = build_admission_pool(year_frame)
+    bootstrap = bootstrap_cutoffs(pool, draws=20, seed=0)
+
+    pd.testing.assert_frame_equal(bootstrap[simulate_cutoffs(pool).columns], simulate_cutoffs(pool))
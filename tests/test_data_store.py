@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils.data_store import to_compact_frame, FRAME_DTYPES
+
+
+def year_frame(ids):
+    return pd.DataFrame({
+        "career": "MEDICINA HUMANA",
+        "id": pd.Series(ids, dtype="int64"),
+        "carrera": "MEDICINA HUMANA",
+        "puntaje": 1000.0,
+        "vacante": 1.0,
+        "observacion": "ALCANZO VACANTE",
+        "segunda_opcion": None,
+    })
+
+
+def test_compact_frame_keeps_ids():
+    id_range = np.iinfo(FRAME_DTYPES["id"])
+    ids = [id_range.min, 240001, id_range.max]
+
+    compact = to_compact_frame(year_frame(ids))
+
+    assert compact["id"].dtype == FRAME_DTYPES["id"]
+    assert compact["id"].tolist() == ids
+
+
+@pytest.mark.parametrize("bad_id", [np.iinfo("int32").max + 1, 3_000_000_000, -(2 ** 40)])
+def test_compact_frame_rejects_ids_out_of_range(bad_id):
+    # astype would wrap them around into other applicants' ids
+    with pytest.raises(ValueError, match="outside the int32 range"):
+        to_compact_frame(year_frame([240001, bad_id]))
@@ -0,0 +1,72 @@
+import os
+
+import pytest
+
+from src.webscraping.ingestion import run_ingestion, parse_editions, IngestionState, DONE, MISSING
+
+INDEX_PATH = "/Website20241/A.html"
+
+
+def ingest(site, tmp_path, editions, **kwargs):
+    return run_ingestion(
+        editions, output_base_path=str(tmp_path / "raw"), state_path=str(tmp_path / "state.json"),
+        base_url=site.base_url, requests_per_second=0, **kwargs,
+    )
+
+
+def test_missing_edition_is_retried_on_the_next_run(site, tmp_path):
+    # Not published yet on the first run, published by the second
+    site.fail(INDEX_PATH, 404)
+
+    assert ingest(site, tmp_path, ["2024-1"]) == {"2024-1": MISSING}
+    assert not os.path.exists(tmp_path / "raw" / "2024-1")
+
+    assert ingest(site, tmp_path, ["2024-1"]) == {"2024-1": DONE}
+    assert site.hits(INDEX_PATH) == 2
+    assert len(os.listdir(tmp_path / "raw" / "2024-1")) == 3
+
+
+def test_done_edition_is_skipped(site, tmp_path):
+    assert ingest(site, tmp_path, ["2024-1", "2024-2"]) == {"2024-1": DONE, "2024-2": MISSING}
+    assert ingest(site, tmp_path, ["2024-1", "2024-2"]) == {"2024-1": DONE, "2024-2": MISSING}
+
+    # Only the edition that is still missing is asked for again
+    assert site.hits(INDEX_PATH) == 1
+    assert site.hits("/Website20242/A.html") == 2
+    assert IngestionState(str(tmp_path / "state.json")).status("2024-2") == MISSING
+
+
+def test_refresh_revalidates_done_editions(site, tmp_path):
+    ingest(site, tmp_path, ["2024-1"])
+    ingest(site, tmp_path, ["2024-1"], refresh=True)
+
+    assert site.hits(INDEX_PATH) == 2
+    assert site.hits("/Website20241/res/medicina.html") == 2
+
+
+def test_cache_is_kept_next_to_the_output_tree(site, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    ingest(site, tmp_path, ["2024-1"])
+
+    assert (tmp_path / "http_cache.json").exists()
+    assert not (tmp_path / "data").exists()
+
+    ingest(site, tmp_path, ["2024-1"], refresh=True, cache_path=str(tmp_path / "other_cache.json"))
+    assert (tmp_path / "other_cache.json").exists()
+
+
+def test_unparsable_index_is_recorded_as_missing(site, tmp_path):
+    # 2025-1 only shows a notice, the other editions are ingested as usual
+    assert ingest(site, tmp_path, ["2024-1", "2025-1"]) == {"2024-1": DONE, "2025-1": MISSING}
+    assert not os.path.exists(tmp_path / "raw" / "2025-1")
+
+    assert ingest(site, tmp_path, ["2024-1", "2025-1"]) == {"2024-1": DONE, "2025-1": MISSING}
+    assert site.hits("/Website20251/A.html") == 2
+
+
+def test_parse_editions():
+    assert parse_editions(["2023-2..2025-1", "2024-1"]) == ["2023-2", "2024-1", "2024-2", "2025-1"]
+    assert parse_editions(["2024-2..2024-2"]) == ["2024-2"]
+
+    with pytest.raises(ValueError, match="2025-1..2024-2"):
+        parse_editions(["2025-1..2024-2"])
@@ -0,0 +1,71 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from conftest import REPO_PATH
+from src.utils import instrumentation
+from src.utils.instrumentation import start_trace, end_trace, bind_trace, count, timed
+
+
+@pytest.fixture
+def tracing():
+    enabled = instrumentation.is_enabled()
+    instrumentation.set_enabled(True)
+    trace = start_trace("test")
+
+    yield trace
+
+    end_trace()
+    instrumentation.set_enabled(enabled)
+
+
+def directory_size(path):
+    return sum( os.path.getsize(os.path.join(root, file)) for root, _, files in os.walk(path) for file in files )
+
+
+@timed("work")
+def work(n):
+    count("work.items", n)
+    return n
+
+
+def test_worker_threads_add_to_the_callers_trace(tracing):
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(bind_trace(work), range(100)))
+
+    assert results == list(range(100))
+    assert tracing.counters["work.items"] == sum(range(100))
+    assert tracing.stages["work"][0] == 100
+
+
+def test_unbound_worker_threads_are_not_traced(tracing):
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(work, range(10)))
+
+    assert "work.items" not in tracing.counters
+
+
+def test_load_trend_misses_are_traced(tracing, monkeypatch):
+    monkeypatch.chdir(REPO_PATH)
+    from src.utils.data_loading import load_trend, _load_year_aggregates
+    from src.utils.data_index import list_years
+
+    _load_year_aggregates.cache_clear()
+    trend = load_trend("MEDICINA HUMANA")
+
+    assert len(trend) > 0
+    assert tracing.counters["cache.trend.miss"] == len(list_years())
+    assert tracing.stages["load_trend"][0] == 1
+
+
+def test_bytes_read_are_the_files_sizes(tracing, tmp_path):
+    from src.utils.data_store import build_store, read_year, read_processed_year, PROCESSED_BASE_PATH
+
+    processed_path = os.path.join(REPO_PATH, PROCESSED_BASE_PATH)
+    read_processed_year("2024-1", processed_path)
+    assert tracing.counters["bytes_read.csv"] == directory_size(os.path.join(processed_path, "2024-1"))
+
+    build_store(processed_path, str(tmp_path / "store"))
+    read_year("2024-1", str(tmp_path / "store"))
+    assert tracing.counters["bytes_read.store"] == directory_size(tmp_path / "store" / "year=2024-1")
@@ -0,0 +1,34 @@
+import os
+
+import pytest
+
+from src.webscraping.pipeline import run_year, run_pipeline, RAW_BASE_PATH, PROCESSED_BASE_PATH
+from conftest import REPO_PATH
+
+YEARS = sorted(os.listdir(os.path.join(REPO_PATH, RAW_BASE_PATH)))
+
+
+@pytest.mark.parametrize("year", YEARS)
+def test_processed_data_is_reproduced(year, tmp_path, monkeypatch):
+    # The committed processed files, byte for byte, from the committed raw files
+    monkeypatch.chdir(REPO_PATH)
+    run_year(year, RAW_BASE_PATH, str(tmp_path), str(tmp_path / "quarantine"))
+
+    expected_path = os.path.join(PROCESSED_BASE_PATH, year)
+    assert sorted(os.listdir(tmp_path / year)) == sorted(os.listdir(expected_path))
+
+    for career_file in os.listdir(expected_path):
+        with open(os.path.join(expected_path, career_file), "rb") as file:
+            assert (tmp_path / year / career_file).read_bytes() == file.read(), career_file
+
+
+def test_unknown_year_is_named(tmp_path):
+    (tmp_path / "raw" / "2024-1").mkdir(parents=True)
+
+    with pytest.raises(FileNotFoundError, match="2099-1"):
+        run_pipeline(
+            years=["2024-1", "2099-1"], raw_base_path=str(tmp_path / "raw"),
+            processed_base_path=str(tmp_path / "processed"), state_path=str(tmp_path / "state.json"),
+        )
+
+    assert not (tmp_path / "processed").exists()
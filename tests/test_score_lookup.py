@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+
+from src.utils.score_lookup import build_score_index, lookup_scores
+
+MEDICINA = "MEDICINA HUMANA"
+DERECHO = "DERECHO"
+HUARMEY = "CONTABILIDAD - HUARMEY"
+
+
+def row(career, id, puntaje, observacion=None, carrera=None, segunda_opcion=None):
+    return {
+        "career": career, "id": id, "carrera": carrera or career, "puntaje": puntaje,
+        "vacante": np.nan, "observacion": observacion, "segunda_opcion": segunda_opcion,
+    }
+
+
+def year_frame():
+    return pd.DataFrame([
+        row(MEDICINA, 1, 1500.0, "ALCANZO VACANTE"),
+        row(MEDICINA, 2, 1200.0, "ALCANZO VACANTE"),
+        row(MEDICINA, 3, 1100.0),
+        row(MEDICINA, 4, 1100.0),
+        row(MEDICINA, 5, 900.0),
+        row(MEDICINA, 6, np.nan, "AUSENTE"),
+        # Admitted as second option, not one of MEDICINA's own applicants
+        row(MEDICINA, 7, 1300.0, "ALCANZO VACANTE SEGUNDA OPCIÓN", carrera=DERECHO, segunda_opcion=MEDICINA),
+        row(DERECHO, 7, 1300.0, "ALCANZO VACANTE SEGUNDA OPCIÓN", segunda_opcion=MEDICINA),
+        row(DERECHO, 8, 1000.0, "ALCANZO VACANTE"),
+        # A file holding only a second option row
+        row(HUARMEY, 9, 950.0, "ALCANZO VACANTE SEGUNDA OPCIÓN", carrera=DERECHO, segunda_opcion=HUARMEY),
+    ])
+
+
+def test_index_holds_own_scored_applicants():
+    index = build_score_index(year_frame())
+
+    assert sorted(index) == sorted([MEDICINA, DERECHO, HUARMEY])
+    assert index[MEDICINA].scores.tolist() == [900.0, 1100.0, 1100.0, 1200.0, 1500.0]
+    assert index[MEDICINA].cutoff_score == 1200.0
+    assert index[DERECHO].scores.tolist() == [1000.0, 1300.0]
+    assert index[DERECHO].cutoff_score == 1000.0
+
+
+def test_rank_percentile_and_admission():
+    index = build_score_index(year_frame())[MEDICINA]
+
+    result = lookup_scores(index, [1500.0, 1250.0, 1200.0, 1100.0, 1000.0, 800.0, 2000.0])
+
+    # Rank 1 is the best, applicants with the same score share the rank
+    assert result["rank"].tolist() == [1, 2, 2, 3, 5, 6, 1]
+    # Share of the 5 applicants at or below the score
+    np.testing.assert_allclose(result["percentile"], [100.0, 80.0, 80.0, 60.0, 20.0, 0.0, 100.0])
+    assert result["admitted"].tolist() == [True, True, True, False, False, False, True]
+    assert (result["applicants"] == 5).all()
+
+
+def test_scores_are_rounded_like_the_data():
+    index = build_score_index(year_frame())[MEDICINA]
+
+    result = lookup_scores(index, [1199.9996, 1100.0004])
+
+    assert result["score"].tolist() == [1200.0, 1100.0]
+    assert result["rank"].tolist() == [2, 3]
+    assert result["admitted"].tolist() == [True, False]
+
+
+def test_batch_matches_one_score_at_a_time():
+    index = build_score_index(year_frame())[MEDICINA]
+    scores = np.linspace(0, 2000, 41)
+
+    batch = lookup_scores(index, scores)
+    single = pd.concat([ lookup_scores(index, [score]) for score in scores ], ignore_index=True)
+
+    pd.testing.assert_frame_equal(batch, single)
+
+
+def test_career_without_own_applicants():
+    index = build_score_index(year_frame())[HUARMEY]
+
+    result = lookup_scores(index, [1000.0]).iloc[0]
+
+    assert len(index.scores) == 0
+    assert np.isnan(index.cutoff_score)
+    assert result["applicants"] == 0
+    assert np.isnan(result["percentile"])
+    assert not result["admitted"]
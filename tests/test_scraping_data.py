@@ -0,0 +1,130 @@
+import os, csv, time
+
+import pytest
+import requests
+
+from src.webscraping.scraping_data import (
+    RateLimiter, create_session, fetch_response, scrape_career, get_career_info,
+    HEADERS, MAX_ATTEMPTS, CHANGED, FAILED,
+)
+
+INDEX_PATH = "/Website20241/A.html"
+CAREER_PATH = "/Website20241/res/medicina.html"
+
+
+def test_index_fetched_once(site, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    get_career_info(site.url(INDEX_PATH), output_base_path=str(tmp_path / "raw"), requests_per_second=0, use_cache=False)
+
+    assert site.hits(INDEX_PATH) == 1
+    for page in ["medicina", "sistemas", "derecho"]:
+        assert site.hits(f"/Website20241/res/{page}.html") == 1
+
+    files = sorted(os.listdir(tmp_path / "raw" / "2024-1"))
+    assert files == ["2024-1-DERECHO.csv", "2024-1-INGENIERÍA DE SISTEMAS.csv", "2024-1-MEDICINA HUMANA.csv"]
+
+
+@pytest.mark.parametrize("statuses", [[503], [500, 502], [429, 503, 429]])
+def test_transient_errors_are_retried(site, no_retry_wait, statuses):
+    site.fail(CAREER_PATH, *statuses)
+
+    with create_session(pool_size=1) as session:
+        response = fetch_response(session, site.url(CAREER_PATH))
+
+    assert response.status_code == 200
+    assert site.hits(CAREER_PATH) == len(statuses) + 1
+
+
+def test_retries_give_up_after_max_attempts(site, no_retry_wait):
+    site.fail(CAREER_PATH, *[503] * MAX_ATTEMPTS)
+
+    with create_session(pool_size=1) as session, pytest.raises(requests.exceptions.HTTPError):
+        fetch_response(session, site.url(CAREER_PATH))
+
+    assert site.hits(CAREER_PATH) == MAX_ATTEMPTS
+
+
+def test_not_found_is_not_retried(site, no_retry_wait):
+    with create_session(pool_size=1) as session, pytest.raises(requests.exceptions.HTTPError) as error:
+        fetch_response(session, site.url("/Website20241/res/missing.html"))
+
+    assert error.value.response.status_code == 404
+    assert site.hits("/Website20241/res/missing.html") == 1
+
+
+def test_rate_limit_spaces_requests_to_a_host(site):
+    rate_limiter = RateLimiter(requests_per_second=20)
+
+    with create_session(pool_size=1) as session:
+        for _ in range(5):
+            fetch_response(session, site.url(CAREER_PATH), rate_limiter)
+
+    times = [ at for _, _, at in site.requests ]
+    gaps = [ later - earlier for earlier, later in zip(times, times[1:]) ]
+    assert min(gaps) >= rate_limiter.interval * 0.9
+
+
+def test_rate_limit_is_per_host():
+    rate_limiter = RateLimiter(requests_per_second=5)
+
+    start = time.monotonic()
+    for host in ["a.example", "b.example", "c.example"]:
+        rate_limiter.wait(f"https://{host}/A.html")
+
+    # A first request to each host goes right away
+    assert time.monotonic() - start < rate_limiter.interval
+
+    rate_limiter.wait("https://a.example/res/1.html")
+    assert time.monotonic() - start >= rate_limiter.interval * 0.9
+
+
+@pytest.mark.parametrize("statuses", [[404], [500] * MAX_ATTEMPTS])
+@pytest.mark.parametrize("streaming", [False, True])
+def test_failed_fetch_keeps_previous_csv(site, no_retry_wait, tmp_path, statuses, streaming):
+    filepath = tmp_path / "2024-1-MEDICINA HUMANA.csv"
+    filepath.write_bytes(b"id,puntaje\r\n1,1000.0\r\n")
+    site.fail(CAREER_PATH, *statuses)
+
+    with create_session(pool_size=1) as session:
+        status = scrape_career(session, None, "MEDICINA HUMANA", site.url(CAREER_PATH), str(filepath), streaming=streaming)
+
+    assert status == FAILED
+    assert filepath.read_bytes() == b"id,puntaje\r\n1,1000.0\r\n"
+    assert not os.path.exists(f"{filepath}.tmp")
+
+
+def test_scraped_csv(site, tmp_path):
+    filepath = tmp_path / "2024-1-MEDICINA HUMANA.csv"
+
+    with create_session(pool_size=1) as session:
+        status = scrape_career(session, None, "MEDICINA HUMANA", site.url(CAREER_PATH), str(filepath))
+
+    assert status == CHANGED
+    with open(filepath, newline="", encoding="utf-8") as file:
+        rows = list(csv.reader(file))
+
+    assert rows[0] == HEADERS
+    assert rows[1] == ["240001", "QUISPE MAMANI, ROSA", "MEDICINA HUMANA", "1557.500", "1", "ALCANZO VACANTE", ""]
+    assert rows[2][1] == "PEÑA & NUÑEZ, JOSÉ"
+    assert [ row[0] for row in rows[1:] ] == ["240001", "240002", "240003", "240004", "240005"]
+
+
+def test_cache_belongs_to_output_tree(site, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    url = site.url(INDEX_PATH)
+
+    first = tmp_path / "first" / "raw"
+    assert len(get_career_info(url, output_base_path=str(first), requests_per_second=0)) == 3
+    assert (tmp_path / "first" / "http_cache.json").exists()
+
+    # Another tree with other CSVs under the same names is not validated with the first tree's cache
+    second = tmp_path / "second" / "raw"
+    (second / "2024-1").mkdir(parents=True)
+    for csv_file in os.listdir(first / "2024-1"):
+        (second / "2024-1" / csv_file).write_bytes(b"id\r\n")
+
+    assert len(get_career_info(url, output_base_path=str(second), requests_per_second=0)) == 3
+    for csv_file in os.listdir(first / "2024-1"):
+        assert (second / "2024-1" / csv_file).read_bytes() == (first / "2024-1" / csv_file).read_bytes()
+    assert not (tmp_path / "data").exists()
@@ -0,0 +1,72 @@
+import os, csv
+
+import pytest
+
+from conftest import SITE_PATH
+from benchmarks.html_parser import generate_page
+from src.webscraping.scraping_data import HEADERS, parse_career_table, stream_career_table, STREAM_CHUNK_SIZE
+
+# Every page of the fixture site: entities, markup inside cells, a script, a second
+# table, an index and a page without any table
+PAGES = sorted(
+    os.path.relpath(os.path.join(root, filename), SITE_PATH)
+    for root, _, filenames in os.walk(SITE_PATH)
+    for filename in filenames if filename.endswith(".html")
+)
+
+# One byte at a time splits every multibyte character, entity and tag across chunks
+CHUNK_SIZES = [1, 2, 3, 7, 64, 1000, STREAM_CHUNK_SIZE]
+
+
+def beautifulsoup_csv(page, path, encoding="utf-8"):
+    # What scrape_career writes without streaming
+    rows = parse_career_table(page.decode(encoding, errors="replace")) or []
+    with open(path, mode="w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(HEADERS)
+        writer.writerows(rows)
+
+    return path.read_bytes()
+
+def streaming_csv(page, path, chunk_size, encoding="utf-8"):
+    chunks = ( page[i:i + chunk_size] for i in range(0, len(page), chunk_size) )
+    with open(path, mode="w", newline="", encoding="utf-8") as file:
+        found_table, _ = stream_career_table(chunks, file, encoding)
+
+    return found_table, path.read_bytes()
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+@pytest.mark.parametrize("page_path", PAGES)
+def test_streaming_matches_beautifulsoup(tmp_path, page_path, chunk_size):
+    with open(os.path.join(SITE_PATH, page_path), "rb") as file:
+        page = file.read()
+
+    expected = beautifulsoup_csv(page, tmp_path / "beautifulsoup.csv")
+    found_table, streamed = streaming_csv(page, tmp_path / "streaming.csv", chunk_size)
+
+    assert streamed == expected
+    assert found_table == (parse_career_table(page.decode("utf-8")) is not None)
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_streaming_matches_beautifulsoup_on_a_long_page(tmp_path, chunk_size):
+    page = generate_page(500, seed=chunk_size)
+
+    expected = beautifulsoup_csv(page, tmp_path / "beautifulsoup.csv")
+    _, streamed = streaming_csv(page, tmp_path / "streaming.csv", chunk_size)
+
+    assert streamed == expected
+    assert len(expected.split(b"\r\n")) == 500 + 2
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, STREAM_CHUNK_SIZE])
+def test_streaming_decodes_the_response_encoding(tmp_path, chunk_size):
+    with open(os.path.join(SITE_PATH, "Website20241", "res", "medicina.html"), encoding="utf-8") as file:
+        page = file.read().encode("cp1252")
+
+    expected = beautifulsoup_csv(page, tmp_path / "beautifulsoup.csv", "cp1252")
+    _, streamed = streaming_csv(page, tmp_path / "streaming.csv", chunk_size, "cp1252")
+
+    assert streamed == expected
+    assert "PEÑA & NUÑEZ, JOSÉ".encode("utf-8") in streamed
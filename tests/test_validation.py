@@ -0,0 +1,135 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.webscraping.validation import validate_year, quarantine, SchemaError
+from src.webscraping.pipeline import run_year
+
+CAREER = "MEDICINA HUMANA"
+OTHER_CAREER = "DERECHO"
+
+
+def raw_row(id, puntaje="1000.000", observacion="ALCANZO VACANTE", career=CAREER, vacante="1"):
+    # As read from the raw CSVs, every value a string
+    return {
+        "career": career, "id": id, "carrera": career, "puntaje": puntaje,
+        "vacante": vacante, "observacion": observacion, "segunda_opcion": np.nan,
+    }
+
+def raw_year(rows):
+    return pd.DataFrame(rows, dtype="object")
+
+
+def reasons(quarantined):
+    return dict(zip(quarantined["id"], quarantined["reason"]))
+
+
+def test_valid_rows_pass_and_are_parsed():
+    valid, quarantined, report = validate_year(raw_year([raw_row("240001"), raw_row("240002", "980.5", np.nan, vacante=np.nan)]))
+
+    assert quarantined.empty
+    assert valid["id"].tolist() == [240001, 240002]
+    assert valid["puntaje"].tolist() == [1000.0, 980.5]
+    assert report == {"rows": 2, "valid": 2, "quarantined": {}, "missing_columns": []}
+
+
+@pytest.mark.parametrize("puntaje", ["abc", "1.000,5", "—"])
+def test_score_that_is_not_a_number(puntaje):
+    valid, quarantined, report = validate_year(raw_year([raw_row("240001"), raw_row("240002", puntaje)]))
+
+    assert valid["id"].tolist() == [240001]
+    assert reasons(quarantined) == {"240002": "invalid_score"}
+    assert report["quarantined"] == {"invalid_score": 1}
+
+
+@pytest.mark.parametrize("puntaje", ["-0.5", "2000.001", "15000"])
+def test_score_out_of_range(puntaje):
+    valid, quarantined, _ = validate_year(raw_year([raw_row("240001", "0.000"), raw_row("240002", "2000.000"), raw_row("240003", puntaje)]))
+
+    # The bounds themselves are valid scores
+    assert valid["id"].tolist() == [240001, 240002]
+    assert reasons(quarantined) == {"240003": "score_out_of_range"}
+
+
+def test_missing_score_is_valid():
+    # Absent applicants have no score
+    valid, quarantined, _ = validate_year(raw_year([raw_row("240001", np.nan, "AUSENTE", vacante=np.nan)]))
+
+    assert quarantined.empty
+    assert np.isnan(valid["puntaje"].iloc[0])
+
+
+@pytest.mark.parametrize("observacion", ["ALCANZO VACANT", "alcanzo vacante", "NO ALCANZO VACANTE"])
+def test_unknown_observacion(observacion):
+    valid, quarantined, _ = validate_year(raw_year([raw_row("240001"), raw_row("240002", observacion=observacion)]))
+
+    assert valid["id"].tolist() == [240001]
+    assert reasons(quarantined) == {"240002": "unknown_observacion"}
+
+
+def test_duplicate_id_keeps_the_first_row():
+    # Across career files of the year, not only within one
+    rows = [
+        raw_row("240001", "1200.000"),
+        raw_row("240002", "1100.000"),
+        raw_row("240001", "900.000", career=OTHER_CAREER),
+        raw_row("240001", "800.000"),
+    ]
+    valid, quarantined, report = validate_year(raw_year(rows))
+
+    assert valid["id"].tolist() == [240001, 240002]
+    assert valid["puntaje"].tolist() == [1200.0, 1100.0]
+    assert quarantined["reason"].tolist() == ["duplicate_id", "duplicate_id"]
+    assert quarantined["career"].tolist() == [OTHER_CAREER, CAREER]
+    assert report["quarantined"] == {"duplicate_id": 2}
+
+
+def test_duplicate_of_a_quarantined_row_is_kept():
+    # The first row that passed every other check is the applicant's
+    valid, quarantined, _ = validate_year(raw_year([raw_row("240001", "abc"), raw_row("240001", "1000.000")]))
+
+    assert valid["puntaje"].tolist() == [1000.0]
+    assert quarantined["reason"].tolist() == ["invalid_score"]
+
+
+def test_first_failed_check_is_the_reason():
+    valid, quarantined, report = validate_year(raw_year([raw_row("240001", "abc", "ALCANZO VACANT")]))
+
+    assert valid.empty
+    assert quarantined["reason"].tolist() == ["invalid_score"]
+    assert report["quarantined"] == {"invalid_score": 1}
+
+
+def test_missing_required_column():
+    with pytest.raises(SchemaError, match="puntaje"):
+        validate_year(raw_year([raw_row("240001")]).drop(columns=["puntaje"]))
+
+
+def test_quarantine_file_is_removed_once_the_year_is_clean(tmp_path):
+    _, quarantined, _ = validate_year(raw_year([raw_row("240001"), raw_row("240002", "abc")]))
+
+    file_path = quarantine(quarantined, "2024-1", str(tmp_path))
+    assert pd.read_csv(file_path)["reason"].tolist() == ["invalid_score"]
+
+    assert quarantine(quarantined.iloc[:0], "2024-1", str(tmp_path)) is None
+    assert not os.path.exists(file_path)
+
+
+def test_pipeline_quarantines_under_the_given_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    raw_path = tmp_path / "raw" / "2024-1"
+    raw_path.mkdir(parents=True)
+    (raw_path / f"2024-1-{CAREER}.csv").write_text(
+        "id,nombre_completo,carrera,puntaje,vacante,observacion,segunda_opcion\n"
+        f"240001,A,{CAREER},1000.000,1,ALCANZO VACANTE,\n"
+        f"240002,B,{CAREER},abc,,,\n",
+        encoding="utf-8",
+    )
+
+    _, _, report = run_year("2024-1", str(tmp_path / "raw"), str(tmp_path / "processed"), str(tmp_path / "quarantine"))
+
+    assert report["quarantined"] == {"invalid_score": 1}
+    assert pd.read_csv(tmp_path / "quarantine" / "2024-1.csv")["id"].tolist() == [240002]
+    assert not (tmp_path / "data").exists()